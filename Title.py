@@ -3,53 +3,93 @@ import random
 import math
 import sys
 
+import numpy as np
 
-class ChaosParticle:
-    """カオスな背景パーティクル"""
-    def __init__(self, screen_width, screen_height):
-        self.x = random.randint(0, screen_width)
-        self.y = random.randint(0, screen_height)
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
-        self.size = random.randint(2, 8)
-        self.color = [random.randint(0, 255) for _ in range(3)]
-        self.life = random.randint(60, 180)
-        self.max_life = self.life
-        self.rotation = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-5, 5)
-        
-    def update(self, screen_width, screen_height):
+from sprite_cache import SpriteCache
+from text_cache import TextCache
+
+# 背景パーティクルの数
+CHAOS_PARTICLE_COUNT = 100
+# 背景パーティクルの色をまとめる幅（スプライトキャッシュのキーを増やしすぎないため）
+CHAOS_COLOR_STEP = 64
+
+
+class ChaosField:
+    """
+    カオスな背景パーティクル（全パーティクルを numpy 配列でまとめて扱う）
+
+    寿命の尽きたパーティクルはその場で新しいパーティクルに置き換えるので、数は常に count 個。
+    描画は (色, 大きさ, アルファ) ごとに事前描画した円を Surface.blits でまとめて貼る。
+    """
+    def __init__(self, screen_width, screen_height, count=CHAOS_PARTICLE_COUNT, seed=None):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.count = count
+        self.rng = np.random.default_rng(seed)
+        # 色 (4^3 段階) x 大きさ (7) x アルファ (8) の円が全部入る大きさ
+        self.sprites = SpriteCache(max_entries=4096, alpha_levels=8)
+        
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.size = np.zeros(count, dtype=np.int32)
+        self.color = np.zeros((count, 3), dtype=np.int32)
+        self.life = np.zeros(count, dtype=np.int32)
+        self.max_life = np.ones(count, dtype=np.int32)
+        self._spawn(np.arange(count))
+    
+    def _spawn(self, idx):
+        """idx のパーティクルを新しく出現させる"""
+        n = len(idx)
+        rng = self.rng
+        self.x[idx] = rng.integers(0, self.screen_width + 1, n)
+        self.y[idx] = rng.integers(0, self.screen_height + 1, n)
+        self.vx[idx] = rng.uniform(-2, 2, n)
+        self.vy[idx] = rng.uniform(-2, 2, n)
+        self.size[idx] = rng.integers(2, 9, n)
+        self.color[idx] = rng.integers(0, 256, (n, 3))
+        life = rng.integers(60, 181, n)
+        self.life[idx] = life
+        self.max_life[idx] = life
+    
+    def update(self):
         self.x += self.vx
         self.y += self.vy
         self.life -= 1
-        self.rotation += self.rotation_speed
         
         # 画面外に出たら反対側から出現
-        if self.x < 0: self.x = screen_width
-        if self.x > screen_width: self.x = 0
-        if self.y < 0: self.y = screen_height
-        if self.y > screen_height: self.y = 0
+        self.x[self.x < 0] = self.screen_width
+        self.x[self.x > self.screen_width] = 0
+        self.y[self.y < 0] = self.screen_height
+        self.y[self.y > self.screen_height] = 0
         
         # 色を変化させる
-        for i in range(3):
-            self.color[i] = (self.color[i] + random.randint(-5, 5)) % 256
-            
+        self.color += self.rng.integers(-5, 6, self.color.shape)
+        self.color %= 256
+        
+        # 寿命の尽きたものはその場で作り直す
+        dead = np.flatnonzero(self.life <= 0)
+        if dead.size:
+            self._spawn(dead)
+    
     def draw(self, surface):
-        alpha = int(255 * (self.life / self.max_life))
-        color = self.color + [alpha]
-        s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        pygame.draw.circle(s, color, (self.size, self.size), self.size)
-        surface.blit(s, (int(self.x - self.size), int(self.y - self.size)))
+        # 色は少しずつ変わり続けるので、段階化してキャッシュのスプライトを使い回す
+        color = self.color // CHAOS_COLOR_STEP * CHAOS_COLOR_STEP
+        sprites = self.sprites.circles(color, self.size, 255 * self.life // self.max_life)
+        sx = (self.x - self.size).astype(np.int32)
+        sy = (self.y - self.size).astype(np.int32)
+        surface.blits(zip(sprites, zip(sx.tolist(), sy.tolist())), doreturn=False)
 
 
 class TitleScreen:
     """カオスなタイトル画面クラス"""
-    def __init__(self, screen_width=1000, screen_height=700):
+    def __init__(self, screen_width=1000, screen_height=700, particle_count=CHAOS_PARTICLE_COUNT):
         self.screen_width = screen_width
         self.screen_height = screen_height
         
         # パーティクル生成
-        self.particles = [ChaosParticle(screen_width, screen_height) for _ in range(100)]
+        self.particles = ChaosField(screen_width, screen_height, particle_count)
         
         # 日本語フォント設定
         try:
@@ -80,6 +120,15 @@ class TitleScreen:
             "注意: Attention!"
         ]
         
+        # 描いた文字列・グリフのキャッシュ（毎フレーム font.render しない）
+        self.subtitle_glyphs = TextCache(self.subtitle_font)
+        self.small_texts = TextCache(self.small_font)
+        # RGB分離エフェクト用のタイトル（色ごとに1枚）
+        self.title_layers = [
+            self.title_font.render(self.title_text, True, color)
+            for color in [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+        ]
+        
         # アニメーション用変数
         self.time = 0
         self.flash_timer = 0
@@ -90,11 +139,7 @@ class TitleScreen:
         self.flash_timer += dt
         
         # パーティクル更新
-        for particle in self.particles:
-            particle.update(self.screen_width, self.screen_height)
-            if particle.life <= 0:
-                self.particles.remove(particle)
-                self.particles.append(ChaosParticle(self.screen_width, self.screen_height))
+        self.particles.update()
     
     def draw(self, surface):
         """タイトル画面を描画"""
@@ -102,8 +147,7 @@ class TitleScreen:
         surface.fill((10, 5, 15))
         
         # パーティクル描画
-        for particle in self.particles:
-            particle.draw(surface)
+        self.particles.draw(surface)
         
         # タイトル描画（グリッチエフェクト付き）
         for i in range(3):
@@ -111,10 +155,7 @@ class TitleScreen:
             offset_y = random.randint(-5, 5) if random.random() < 0.1 else 0
             
             # RGB分離エフェクト
-            colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
-            color = colors[i]
-            
-            title_surface = self.title_font.render(self.title_text, True, color)
+            title_surface = self.title_layers[i]
             title_rect = title_surface.get_rect(center=(self.screen_width // 2 + offset_x + (i-1)*3, 200 + offset_y))
             surface.blit(title_surface, title_rect)
         
@@ -127,13 +168,13 @@ class TitleScreen:
                 int(128 + 127 * math.sin(self.time * 2 + i * 0.5 + 2)),
                 int(128 + 127 * math.sin(self.time * 2 + i * 0.5 + 4))
             )
-            char_surface = self.subtitle_font.render(char, True, char_color)
+            char_surface = self.subtitle_glyphs.tinted(char, char_color)
             char_rect = char_surface.get_rect(center=(350 + i * 20, subtitle_y + char_offset))
             surface.blit(char_surface, char_rect)
         
         # 点滅するスタートテキスト
         if (self.flash_timer // 500) % 2 == 0:
-            start_surface = self.small_font.render(self.start_text, True, (255, 255, 100))
+            start_surface = self.small_texts.render(self.start_text, (255, 255, 100))
             start_rect = start_surface.get_rect(center=(self.screen_width // 2, 500))
             surface.blit(start_surface, start_rect)
         
@@ -144,15 +185,32 @@ class TitleScreen:
         
         # 警告テキスト
         warning_index = int(self.time * 2) % len(self.warning_texts)
-        warning_surface = self.small_font.render(self.warning_texts[warning_index], True, (255, 50, 50))
+        warning_surface = self.small_texts.render(self.warning_texts[warning_index], (255, 50, 50))
         warning_rect = warning_surface.get_rect(center=(self.screen_width // 2, 600))
         surface.blit(warning_surface, warning_rect)
     
-    def run(self, screen):
-        """タイトル画面を実行（Spaceが押されるまでループ）"""
+    def draw_progress(self, surface, progress, label):
+        """ゲーム開始の準備の進み具合を画面下に描画"""
+        bar = pygame.Rect(0, 0, 400, 8)
+        bar.center = (self.screen_width // 2, 660)
+        pygame.draw.rect(surface, (60, 40, 70), bar)
+        pygame.draw.rect(surface, (255, 255, 100), (bar.x, bar.y, int(bar.width * progress), bar.height))
+        if label:
+            label_surface = self.small_texts.render(label, (200, 200, 200))
+            surface.blit(label_surface, label_surface.get_rect(midtop=(bar.centerx, bar.bottom + 6)))
+    
+    def run(self, screen, pipeline=None):
+        """
+        タイトル画面を実行（Spaceが押されるまでループ）
+        
+        Args:
+            pipeline: 裏で進めるゲーム開始の準備 (startup.StartupPipeline)。
+                      毎フレーム少しずつ進めて進捗を表示し、Space が押されても準備が終わるまではタイトルを続ける
+        """
         clock = pygame.time.Clock()
         
         waiting = True
+        start_requested = False
         while waiting:
             dt = clock.tick(60)
             
@@ -162,8 +220,17 @@ class TitleScreen:
                     sys.exit()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        waiting = False
+                        start_requested = True
+            
+            if start_requested and (pipeline is None or pipeline.done):
+                waiting = False
             
             self.update(dt)
             self.draw(screen)
-            pygame.display.flip()
\ No newline at end of file
+            if pipeline is not None and not pipeline.done:
+                self.draw_progress(screen, pipeline.progress, pipeline.label)
+            pygame.display.flip()
+            
+            # 画面を出してから準備を進める（最初のフレームから画面が出るように）
+            if pipeline is not None:
+                pipeline.step()
@@ -1,5 +1,7 @@
 import pygame
 
+from sprite_cache import shared_cache
+
 class Trap:
     """トラップクラス（透明化）"""
     def __init__(self, x: int, y: int, tile_size: int, trap_type: str = "spike"):
@@ -89,8 +91,7 @@ class Trap:
             "poison": (0, 255, 0, 128)
         }.get(self.trap_type, (255, 0, 0, 128))
         
-        s = pygame.Surface((self.tile_size, self.tile_size), pygame.SRCALPHA)
-        s.fill(color)
+        s = shared_cache().rect(color[:3], (self.tile_size, self.tile_size), color[3])
         surface.blit(s, (screen_x, screen_y))
         
         if self.trap_type == "spike":
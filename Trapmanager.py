@@ -1,110 +1,90 @@
 import pygame
 import random
 import math
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from map_engine.map_generator import MapGenerator
 from Trap import Trap
+from particles import ParticleSystem
+from sprite_cache import shared_cache
 
+# 生成するトラップの種類
+TRAP_TYPES = ["spike", "fire", "poison"]
 
-class TrapEffectParticle:
-    """罠エフェクト用のパーティクル"""
-    def __init__(self, x, y, trap_type):
-        self.x = x
-        self.y = y
-        
-        # 罠の種類によって色とエフェクトを変更
-        if trap_type == "spike":
-            self.color = (255, 0, 0)  # 赤
-            self.vx = random.uniform(-5, 5)
-            self.vy = random.uniform(-8, -2)
-            self.gravity = 0.3
-        elif trap_type == "fire":
-            self.color = (255, random.randint(100, 200), 0)  # オレンジ
-            self.vx = random.uniform(-3, 3)
-            self.vy = random.uniform(-6, -2)
-            self.gravity = -0.1  # 上に昇る
-        elif trap_type == "poison":
-            self.color = (0, 255, 0)  # 緑
-            self.vx = random.uniform(-4, 4)
-            self.vy = random.uniform(-5, -1)
-            self.gravity = 0.05
-        else:
-            self.color = (255, 255, 255)
-            self.vx = random.uniform(-4, 4)
-            self.vy = random.uniform(-6, -2)
-            self.gravity = 0.2
-            
-        self.size = random.randint(3, 8)
-        self.life = random.randint(30, 60)
-        self.max_life = self.life
-        
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += self.gravity
-        self.life -= 1
-        self.vx *= 0.98  # 空気抵抗
-        
-    def draw(self, surface, camera_x, camera_y):
-        if self.life <= 0:
-            return
-            
-        screen_x = int(self.x - camera_x)
-        screen_y = int(self.y - camera_y)
-        
-        alpha = int(255 * (self.life / self.max_life))
-        color = self.color + (alpha,)
-        
-        s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        pygame.draw.circle(s, color, (self.size, self.size), self.size)
-        surface.blit(s, (screen_x - self.size, screen_y - self.size))
+
+# 罠の種類ごとのパーティクルの設定（色の候補・初速の範囲・重力）
+PARTICLE_PRESETS = {
+    "spike": dict(colors=[(255, 0, 0)], vx_range=(-5, 5), vy_range=(-8, -2), gravity=0.3),  # 赤
+    # オレンジ (緑の成分を 100〜200 で散らす)。上に昇る
+    "fire": dict(colors=[(255, g, 0) for g in range(100, 201, 20)], vx_range=(-3, 3), vy_range=(-6, -2), gravity=-0.1),
+    "poison": dict(colors=[(0, 255, 0)], vx_range=(-4, 4), vy_range=(-5, -1), gravity=0.05),  # 緑
+}
+DEFAULT_PARTICLE_PRESET = dict(colors=[(255, 255, 255)], vx_range=(-4, 4), vy_range=(-6, -2), gravity=0.2)
 
 
 class TrapEffect:
-    """罠を踏んだ時のエフェクト"""
-    def __init__(self, x, y, trap_type, tile_size):
+    """
+    罠を踏んだ時のエフェクト
+
+    TrapManager が使い終わったものを取っておき、reset() で別の罠のエフェクトとして使い回す。
+    持続時間・リングの広がる速さは 60fps の1フレームを dt=1.0 とした単位。
+    """
+    def __init__(self, x, y, trap_type, tile_size, particles: Optional[ParticleSystem] = None):
+        """
+        Args:
+            particles: パーティクルの放出先（TrapManager が全エフェクトで共有する ParticleSystem）
+        """
+        self.reset(x, y, trap_type, tile_size, particles)
+    
+    def reset(self, x, y, trap_type, tile_size, particles: Optional[ParticleSystem] = None):
+        """タイル (x, y) の罠のエフェクトとして初期状態に戻す"""
         self.x = x * tile_size + tile_size // 2  # タイル中心
         self.y = y * tile_size + tile_size // 2
         self.trap_type = trap_type
         self.tile_size = tile_size
-        self.particles = []
         self.life = 60  # エフェクトの持続時間
         self.time = 0
         
         # パーティクル生成
-        particle_count = 30 if trap_type == "fire" else 20
-        for _ in range(particle_count):
-            self.particles.append(TrapEffectParticle(self.x, self.y, trap_type))
+        if particles is not None:
+            particle_count = 30 if trap_type == "fire" else 20
+            particles.emit(self.x, self.y, particle_count, **PARTICLE_PRESETS.get(trap_type, DEFAULT_PARTICLE_PRESET))
         
         # 爆発リング用
         self.ring_radius = 0
         self.ring_max_radius = tile_size * 2
         self.ring_speed = tile_size / 10
         
-    def update(self):
-        self.life -= 1
-        self.time += 1
-        
-        # パーティクル更新
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                self.particles.remove(particle)
+    def update(self, dt: float = 1.0):
+        self.life -= dt
+        self.time += dt
         
         # リング拡大
         if self.ring_radius < self.ring_max_radius:
-            self.ring_radius += self.ring_speed
+            self.ring_radius += self.ring_speed * dt
             
-    def draw(self, surface, camera_x, camera_y):
+    def get_rect(self) -> pygame.Rect:
+        """リング・フラッシュが描画しうる範囲（ワールド座標）を取得（パーティクルは ParticleSystem.get_rect()）"""
+        half = max(self.tile_size * 3 // 2, int(self.ring_max_radius)) + 1
+        return pygame.Rect(int(self.x) - half, int(self.y) - half, half * 2, half * 2)
+        
+    def draw(self, surface, camera_x, camera_y, ahead: float = 0.0):
+        """
+        Args:
+            ahead: 最後の update() からの経過時間（update() の dt と同じ単位）。その分だけ進めた状態を描く
+        """
         if self.life <= 0:
             return
         
         screen_x = int(self.x - camera_x)
         screen_y = int(self.y - camera_y)
+        time = self.time + ahead
+        ring_radius = self.ring_radius
+        if ring_radius < self.ring_max_radius:
+            ring_radius = min(self.ring_max_radius, ring_radius + self.ring_speed * ahead)
         
         # 爆発リング描画
-        if self.ring_radius < self.ring_max_radius:
-            alpha = int(255 * (1 - self.ring_radius / self.ring_max_radius))
+        if ring_radius < self.ring_max_radius:
+            alpha = int(255 * (1 - ring_radius / self.ring_max_radius))
             
             if self.trap_type == "spike":
                 color = (255, 0, 0, alpha)
@@ -115,13 +95,13 @@ class TrapEffect:
             else:
                 color = (255, 255, 255, alpha)
             
-            s = pygame.Surface((int(self.ring_radius * 2), int(self.ring_radius * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(s, color, (int(self.ring_radius), int(self.ring_radius)), int(self.ring_radius), 3)
-            surface.blit(s, (screen_x - int(self.ring_radius), screen_y - int(self.ring_radius)))
+            radius = int(ring_radius)
+            ring = shared_cache().circle(color[:3], radius, color[3], width=3)
+            surface.blit(ring, (screen_x - radius, screen_y - radius))
         
         # 画面振動用の線（オプション）
-        if self.time < 10:
-            flash_alpha = int(200 * (1 - self.time / 10))
+        if time < 10:
+            flash_alpha = int(200 * (1 - time / 10))
             if self.trap_type == "spike":
                 flash_color = (255, 0, 0, flash_alpha)
             elif self.trap_type == "fire":
@@ -131,81 +111,223 @@ class TrapEffect:
             else:
                 flash_color = (255, 255, 255, flash_alpha)
             
-            flash_s = pygame.Surface((self.tile_size * 3, self.tile_size * 3), pygame.SRCALPHA)
-            pygame.draw.circle(flash_s, flash_color, (self.tile_size * 3 // 2, self.tile_size * 3 // 2), self.tile_size * 3 // 2)
-            surface.blit(flash_s, (screen_x - self.tile_size * 3 // 2, screen_y - self.tile_size * 3 // 2))
-        
-        # パーティクル描画
-        for particle in self.particles:
-            particle.draw(surface, camera_x, camera_y)
+            radius = self.tile_size * 3 // 2
+            flash_s = shared_cache().circle(flash_color[:3], radius, flash_color[3])
+            surface.blit(flash_s, (screen_x - radius, screen_y - radius))
 
 
 class TrapManager:
-    """トラップ管理クラス"""
-    def __init__(self, tile_size: int):
-        self.traps: List[Trap] = []
+    """
+    トラップ管理クラス
+    
+    トラップはタイル座標 -> Trap の辞書で持つ（1タイルに1つ）。
+    プレイヤーの当たり判定はプレイヤーのいるタイルを引くだけ、発動したトラップの削除も O(1)。
+    
+    エフェクトは max_effects 個までで、終わったものは取っておいて次の発動で使い回す。
+    パーティクルは max_particles 個までで、超えた分は particle_overflow の方法で捌く（ParticleSystem 参照）。
+    どちらも上限があるので、罠が立て続けに発動してもフレームの処理量は一定以下に収まる。
+    """
+    def __init__(self, tile_size: int, max_effects: int = 32, max_particles: int = 1024,
+                 particle_overflow: str = "shortest"):
         self.tile_size = tile_size
-        self.effects: List[TrapEffect] = []  # エフェクトリスト
+        self.max_effects = max(1, max_effects)
+        self._by_tile: Dict[Tuple[int, int], Trap] = {}
+        # update() で何か処理をするトラップ（Trap.update を上書きしたもの）だけを毎フレーム更新する
+        self._animated: Dict[Tuple[int, int], Trap] = {}
+        self.effects: List[TrapEffect] = []  # エフェクトリスト（発動した順）
+        self._effect_pool: List[TrapEffect] = []  # 使い終わって再利用を待つエフェクト
+        # 全エフェクトのパーティクルをまとめて持つ
+        self.particles = ParticleSystem(max_particles=max_particles, overflow=particle_overflow)
+    
+    @property
+    def traps(self):
+        """全てのトラップ（len() と for 文で使える）"""
+        return self._by_tile.values()
+    
+    @traps.setter
+    def traps(self, traps: Iterable[Trap]):
+        self.set_traps(traps)
+    
+    def generate_traps(self, map_gen: MapGenerator, trap_count: int = 20, rng: Optional[random.Random] = None):
+        """
+        マップ上にランダムにトラップを生成
+        
+        Args:
+            rng: 使用する乱数生成器（シードから同じ配置を再現する場合に渡す）
+        """
+        self.set_traps(self.plan_traps(map_gen, trap_count, rng))
     
-    def generate_traps(self, map_gen: MapGenerator, trap_count: int = 20):
-        """マップ上にランダムにトラップを生成"""
-        self.traps.clear()
-        self.effects.clear()  # エフェクトもクリア
-        trap_types = ["spike", "fire", "poison"]
+    def plan_traps(self, map_gen: MapGenerator, trap_count: int = 20, rng: Optional[random.Random] = None) -> List[Trap]:
+        """
+        トラップの配置だけを決めて返す（現在のトラップは変更しない）
+        
+        map_gen が sample_floor_cells() を持っていれば (MapGenerator / FloorLayout) 床のセルの索引から選ぶ。
+        それ以外は width / height / is_floor() を使ってランダムに探す。
+        別スレッドから呼んでもよい。
+        """
+        rng = rng or random
+        if hasattr(map_gen, 'sample_floor_cells'):
+            # 床のセルの索引から重複なしで選ぶ（床が足りる限り必ず trap_count 個になる）
+            # 開始位置と階段の上には置かない
+            exclude = {pos for pos in (map_gen.start_pos(), getattr(map_gen, 'stairs_pos', None)) if pos}
+            cells = map_gen.sample_floor_cells(trap_count, rng, exclude=exclude)
+            return [Trap(x, y, self.tile_size, rng.choice(TRAP_TYPES)) for x, y in cells]
+        
+        traps: List[Trap] = []
+        used = set()
         attempts = 0
         max_attempts = trap_count * 10
         
-        while len(self.traps) < trap_count and attempts < max_attempts:
+        while len(traps) < trap_count and attempts < max_attempts:
             attempts += 1
-            x = random.randint(0, map_gen.width - 1)
-            y = random.randint(0, map_gen.height - 1)
+            x = rng.randint(0, map_gen.width - 1)
+            y = rng.randint(0, map_gen.height - 1)
             
-            if map_gen.tilemap[x][y] == 1:
-                if not any(t.tile_x == x and t.tile_y == y for t in self.traps):
-                    trap_type = random.choice(trap_types)
-                    self.traps.append(Trap(x, y, self.tile_size, trap_type))
+            if map_gen.is_floor(x, y):
+                if (x, y) not in used:
+                    used.add((x, y))
+                    trap_type = rng.choice(TRAP_TYPES)
+                    traps.append(Trap(x, y, self.tile_size, trap_type))
+        return traps
+    
+    def plan_traps_at(self, cells: List[Tuple[int, int]], trap_count: int = 20,
+                      rng: Optional[random.Random] = None, exclude=None) -> List[Trap]:
+        """候補のタイル座標から重複なしでトラップの配置を決めて返す（exclude のタイルには置かない）"""
+        rng = rng or random
+        if exclude:
+            cells = [cell for cell in cells if cell not in exclude]
+        chosen = rng.sample(cells, min(trap_count, len(cells)))
+        return [Trap(x, y, self.tile_size, rng.choice(TRAP_TYPES)) for x, y in chosen]
+    
+    def set_traps(self, traps: Iterable[Trap]):
+        """トラップを差し替える（エフェクトもクリア）"""
+        self._by_tile = {}
+        self._animated = {}
+        for trap in traps:
+            self.add_trap(trap)
+        self._effect_pool.extend(self.effects)
+        self.effects.clear()
+        self.particles.clear()
+    
+    def add_trap(self, trap: Trap):
+        """トラップを1つ置く（同じタイルのトラップは置き換える）"""
+        key = (trap.tile_x, trap.tile_y)
+        self._by_tile[key] = trap
+        if type(trap).update is not Trap.update:
+            self._animated[key] = trap
+        else:
+            self._animated.pop(key, None)
+    
+    def remove_trap(self, tile_x: int, tile_y: int) -> Optional[Trap]:
+        """タイルのトラップを取り除いて返す"""
+        self._animated.pop((tile_x, tile_y), None)
+        return self._by_tile.pop((tile_x, tile_y), None)
+    
+    def trap_at(self, tile_x: int, tile_y: int) -> Optional[Trap]:
+        """タイルにあるトラップ（なければ None）"""
+        return self._by_tile.get((tile_x, tile_y))
+    
+    def traps_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> List[Trap]:
+        """タイル範囲 [x0, x1) x [y0, y1) にあるトラップ"""
+        area = max(0, x1 - x0) * max(0, y1 - y0)
+        if area <= len(self._by_tile):
+            # 範囲の方が小さければタイルを引く
+            by_tile = self._by_tile
+            return [by_tile[(x, y)] for x in range(x0, x1) for y in range(y0, y1) if (x, y) in by_tile]
+        return [t for t in self._by_tile.values() if x0 <= t.tile_x < x1 and y0 <= t.tile_y < y1]
+    
+    def traps_in_radius(self, tile_x: int, tile_y: int, radius: float) -> List[Trap]:
+        """タイル (tile_x, tile_y) からの距離が radius タイル以内のトラップ（罠の発見・可視化用）"""
+        r = int(radius)
+        r2 = radius * radius
+        return [
+            t for t in self.traps_in_rect(tile_x - r, tile_y - r, tile_x + r + 1, tile_y + r + 1)
+            if (t.tile_x - tile_x) ** 2 + (t.tile_y - tile_y) ** 2 <= r2
+        ]
     
     def update(self, dt: float = 1.0):
-        """全てのトラップとエフェクトを更新"""
-        for trap in self.traps:
+        """
+        全てのトラップとエフェクトを dt だけ進める
+        
+        Args:
+            dt: 経過時間（60fps の1フレームを 1.0 とする。game_loop.GameLoop.step_scale）
+        """
+        for trap in self._animated.values():
             trap.update(dt)
         
-        # エフェクト更新
-        for effect in self.effects[:]:
-            effect.update()
-            if effect.life <= 0:
-                self.effects.remove(effect)
+        # エフェクト更新（終わったものはプールに戻す）
+        alive = []
+        for effect in self.effects:
+            effect.update(dt)
+            if effect.life > 0:
+                alive.append(effect)
+            else:
+                self._effect_pool.append(effect)
+        self.effects = alive
+        self.particles.update(dt)
     
-    def draw(self, surface: pygame.Surface, camera_x: int = 0, camera_y: int = 0, show_debug: bool = False):
-        """全てのトラップとエフェクトを描画"""
-        for trap in self.traps:
-            trap.draw(surface, camera_x, camera_y, show_debug)
+    def draw(self, surface: pygame.Surface, camera_x: int = 0, camera_y: int = 0, show_debug: bool = False,
+             ahead: float = 0.0):
+        """
+        画面内のトラップとエフェクトを描画
+        
+        Args:
+            ahead: 最後の update() からの経過時間。エフェクトとパーティクルはその分だけ進めて描く（補間）
+        """
+        if show_debug:
+            ts = self.tile_size
+            x0, y0 = camera_x // ts, camera_y // ts
+            x1 = (camera_x + surface.get_width()) // ts + 1
+            y1 = (camera_y + surface.get_height()) // ts + 1
+            for trap in self.traps_in_rect(x0, y0, x1, y1):
+                trap.draw(surface, camera_x, camera_y, show_debug)
         
         # エフェクト描画
         for effect in self.effects:
-            effect.draw(surface, camera_x, camera_y)
+            effect.draw(surface, camera_x, camera_y, ahead)
+        self.particles.draw(surface, camera_x, camera_y, ahead)
     
     def check_collisions(self, player_rect: pygame.Rect) -> int:
         """
         プレイヤーとの衝突チェックして合計ダメージを返す
-        発動したトラップはリストから削除され、エフェクトが生成される
+        発動したトラップは取り除かれ、エフェクトが生成される
+        
+        プレイヤーの矩形が重なるタイル（通常は1タイル）のトラップだけを調べる。
         """
+        ts = self.tile_size
         total_damage = 0
-        traps_to_remove = []
+        for x in range(player_rect.left // ts, (player_rect.right - 1) // ts + 1):
+            for y in range(player_rect.top // ts, (player_rect.bottom - 1) // ts + 1):
+                total_damage += self.trigger_at(x, y)
+        return total_damage
+    
+    def trigger_at(self, tile_x: int, tile_y: int) -> int:
+        """タイルのトラップを発動してダメージを返す（発動したトラップは取り除いてエフェクトを出す）"""
+        trap = self._by_tile.get((tile_x, tile_y))
+        if trap is None or not trap.active:
+            return 0
+        damage = trap.activate()
+        if damage > 0:
+            self.spawn_effect(trap.tile_x, trap.tile_y, trap.trap_type)
+            self.remove_trap(tile_x, tile_y)
+        return damage
+    
+    def spawn_effect(self, tile_x: int, tile_y: int, trap_type: str) -> TrapEffect:
+        """
+        タイルにエフェクトを出す
         
-        for trap in self.traps:
-            collision, damage, should_remove = trap.check_collision(player_rect)
-            
-            if collision and damage > 0:
-                total_damage += damage
-                if should_remove:
-                    # エフェクトを生成
-                    effect = TrapEffect(trap.tile_x, trap.tile_y, trap.trap_type, self.tile_size)
-                    self.effects.append(effect)
-                    traps_to_remove.append(trap)
-        
-        # 発動したトラップをリストから削除
-        for trap in traps_to_remove:
-            self.traps.remove(trap)
-        
-        return total_damage
\ No newline at end of file
+        プールのエフェクトを使い回し、上限に達していれば一番古いエフェクトを打ち切って使う。
+        """
+        if len(self.effects) >= self.max_effects:
+            effect = self.effects.pop(0)
+        elif self._effect_pool:
+            effect = self._effect_pool.pop()
+        else:
+            effect = None
+        
+        if effect is None:
+            effect = TrapEffect(tile_x, tile_y, trap_type, self.tile_size, self.particles)
+        else:
+            effect.reset(tile_x, tile_y, trap_type, self.tile_size, self.particles)
+        self.effects.append(effect)
+        return effect
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import List, Tuple
+
+import numpy as np
+import pygame
+
+from enemy_pool import EnemyPool, STATE_ASLEEP
+
+
+class AILodScheduler:
+    """
+    敵の AI を距離に応じて間引くスケジューラ
+
+    プレイヤーが1歩動くたびに、EnemyPool.step_along() で動かす敵を次の3段階で選ぶ。
+    - 近い敵 : 画面内にいるか、プレイヤーまでの歩数が near_radius 以内 → 毎ターン動く
+    - 遠い敵 : 歩数が sleep_radius 以内 → far_interval ターンに1回だけ動く（スロット番号でずらして負荷を分散）
+    - 眠る敵 : それより遠い・たどり着けない・距離場の外 → プレイヤーが同じ部屋に入るまで動かない
+
+    直近のターンで動かした敵の数は last_ticked / summary() で確認できる。
+    """
+
+    def __init__(self, near_radius: int = 16, sleep_radius: int = 48, far_interval: int = 4):
+        self.near_radius = near_radius
+        self.sleep_radius = sleep_radius
+        self.far_interval = max(1, far_interval)
+        self.turn = 0
+
+        # 直近のターンの集計
+        self.last_total = 0
+        self.last_ticked = 0
+        self.last_near = 0
+        self.last_far = 0
+        self.last_asleep = 0
+
+    def select(self, pool: EnemyPool, flow_field, rooms: List[pygame.Rect], player_tile: Tuple[int, int],
+               camera_x: int, camera_y: int, screen_w: int, screen_h: int) -> np.ndarray:
+        """
+        このターンに動かす敵のマスク (長さ pool.count) を返す
+
+        Args:
+            pool: 敵
+            flow_field: プレイヤーへの距離場 (map_gen.flow_field())
+            rooms: フロアの部屋 (眠っている敵を起こす判定に使う)
+            player_tile: プレイヤーのタイル座標
+            camera_x, camera_y, screen_w, screen_h: 画面に映っている範囲 (ピクセル)
+        """
+        alive = pool.alive[:pool.count]
+        dist = pool.field_distance(flow_field)
+
+        on_screen = np.zeros(pool.count, dtype=bool)
+        on_screen[pool.visible(camera_x, camera_y, screen_w, screen_h)] = True
+        near = alive & (on_screen | ((dist >= 0) & (dist <= self.near_radius)))
+        far = alive & ~near & (dist >= 0) & (dist <= self.sleep_radius)
+        asleep = alive & ~near & ~far
+
+        # 遠い敵は far_interval ターンに1回
+        slots = np.arange(pool.count)
+        far_tick = far & ((slots + self.turn) % self.far_interval == 0)
+
+        # 眠っている敵は、プレイヤーと同じ部屋にいれば起こす
+        woken = np.zeros(pool.count, dtype=bool)
+        if asleep.any():
+            for room in rooms:
+                if room.collidepoint(player_tile):
+                    woken |= asleep & pool.mask_in_rect(room.left, room.top, room.right, room.bottom)
+        pool.state[:pool.count][asleep & ~woken] = STATE_ASLEEP
+
+        ticked = near | far_tick | woken
+        self.turn += 1
+        self.last_total = int(np.count_nonzero(alive))
+        self.last_ticked = int(np.count_nonzero(ticked))
+        self.last_near = int(np.count_nonzero(near))
+        self.last_far = int(np.count_nonzero(far))
+        self.last_asleep = int(np.count_nonzero(asleep & ~woken))
+        return ticked
+
+    def summary(self) -> str:
+        """直近のターンの集計（デバッグ表示用）"""
+        return (f"AI: {self.last_ticked}/{self.last_total} ticked "
+                f"(near {self.last_near}, far {self.last_far}, asleep {self.last_asleep})")
@@ -0,0 +1,24 @@
+from typing import Iterable
+
+import numpy as np
+
+
+def grow_arrays(obj, fields: Iterable[str], capacity: int):
+    """
+    obj の numpy 配列の属性 fields の容量（先頭の次元）を capacity 以上にする（足りなければ倍々で増やす）
+
+    EnemyPool / ParticleSystem のように、同じ長さの配列を並べて持つクラスで使う。
+    既存の値はそのまま残し、増やした分は 0 で埋める。
+    """
+    fields = tuple(fields)
+    size = len(getattr(obj, fields[0]))
+    if capacity <= size:
+        return
+    size = max(1, size)
+    while size < capacity:
+        size *= 2
+    for name in fields:
+        old = getattr(obj, name)
+        new = np.zeros((size,) + old.shape[1:], dtype=old.dtype)
+        new[:len(old)] = old
+        setattr(obj, name, new)
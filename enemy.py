@@ -5,16 +5,50 @@ from collections import deque
 
 import pygame
 
-__all__ = ["Enemy"]
+__all__ = ["Enemy", "greedy_step"]
+
+
+def greedy_step(pos: Tuple[int, int], target: Tuple[int, int], map_gen, occupied=None) -> Optional[Tuple[int, int]]:
+	"""
+	pos から target への直線距離が最も縮まる、空いた床の隣接タイル（なければ None）
+
+	四方向（上下左右）の床のタイルを target への二乗距離の順に調べ、occupied に入っていない最初のタイルを返す。
+	EnemyPool で距離場の外にいる敵が使う追跡の規則。
+	"""
+	x, y = int(pos[0]), int(pos[1])
+	ptx, pty = int(target[0]), int(target[1])
+	# 既に同じタイルなら動かない
+	if (x, y) == (ptx, pty):
+		return None
+
+	# 距離が同じなら 右・左・下・上 の順
+	candidates = sorted(
+		(
+			((nx - ptx) * (nx - ptx) + (ny - pty) * (ny - pty), (nx, ny))
+			for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+			if map_gen.is_floor(nx, ny)
+		),
+		key=lambda c: c[0],
+	)
+	occ = occupied or ()
+	for _, tile in candidates:
+		# プレイヤーや他の敵と重ならないようにチェック
+		if tile not in occ:
+			return tile
+	return None
 
 
 class Enemy:
 	"""敵キャラの基本クラス。
 
 	Base.py からインスタンス化して使えるように、座標・体力・速度・描画処理を提供します。
-	プレイヤー位置が渡されれば追跡し、渡されなければランダム歩行します。
+	ゲーム中の敵は EnemyPool がまとめて持ち、移動も EnemyPool が行います。
+	このクラスは画像の読み込み (_load_image) と配置の決定 (spawn_positions) も受け持ちます。
 	"""
 
+	# 読み込み済み画像のキャッシュ（(パス, タイルサイズ) -> Surface）。敵ごとにディスクから読まない
+	_image_cache: dict = {}
+
 	def __init__(
 		self,
 		x: int,
@@ -40,44 +74,60 @@ class Enemy:
 
 		# 画像の読み込み（省略可）
 		if image_path:
+			self._image = self._load_image(image_path, tile_size)
+
+		# ランダム移動のためのタイマー
+		self._change_dir_timer = 0.0
+
+	@classmethod
+	def _load_image(cls, image_path: str, tile_size: int) -> Optional[pygame.Surface]:
+		"""画像を読み込んでタイルサイズに縮小する（同じ画像は1度だけ読み込む）"""
+		base_dir = os.path.dirname(os.path.abspath(__file__))
+		full_path = (
+			image_path
+			if os.path.isabs(image_path)
+			else os.path.join(base_dir, image_path)
+		)
+		key = (full_path, tile_size)
+		if key not in cls._image_cache:
 			try:
-				base_dir = os.path.dirname(os.path.abspath(__file__))
-				full_path = (
-					image_path
-					if os.path.isabs(image_path)
-					else os.path.join(base_dir, image_path)
-				)
 				img = pygame.image.load(full_path).convert_alpha()
-				self._image = pygame.transform.scale(img, (tile_size, tile_size))
+				cls._image_cache[key] = pygame.transform.scale(img, (tile_size, tile_size))
 			except Exception:
 				# 読み込み失敗時は None のままにしてフォールバック描画を行う
-				self._image = None
+				cls._image_cache[key] = None
+		return cls._image_cache[key]
 
-		# ランダム移動のためのタイマー
-		self._change_dir_timer = 0.0
+	@staticmethod
+	def spawn_positions(map_gen, count_per_room: int, rng: Optional[random.Random] = None) -> list[Tuple[int, int]]:
+		"""敵を配置するタイル座標だけを決める（Surface を扱わないので別スレッドから呼んでもよい）。
 
-	@classmethod
-	def spawn(cls, map_gen, count_per_room: int) -> list["Enemy"]:
-		"""マップ情報に基づいて敵をランダムに配置・生成する。"""
-		enemies = []
+		map_gen が sample_floor_cells() を持っていれば (MapGenerator / FloorLayout)、
+		各部屋の床から重複なしで選ぶので、敵同士が重ならず開始位置にも置かれない。
+		それ以外 (ChunkedWorld) は各部屋の中からランダムに選ぶ（重なる位置と開始位置は飛ばす）。
+		"""
+		rng = rng or random
+		if hasattr(map_gen, "sample_floor_cells"):
+			used = {map_gen.start_pos()}
+			positions = []
+			for i in range(len(map_gen.rooms)):
+				cells = map_gen.sample_floor_cells(count_per_room, rng, room=i, exclude=used)
+				used.update(cells)
+				positions.extend(cells)
+			return positions
+
+		positions = []
+		# 開始位置には置かない
+		used = {map_gen.start_pos()} if hasattr(map_gen, "start_pos") else set()
 		for room in map_gen.rooms:
 			for _ in range(count_per_room):
-				tx = random.randint(max(room.left + 1, 0), max(room.right - 2, room.left))
-				ty = random.randint(max(room.top + 1, 0), max(room.bottom - 2, room.top))
-				ex = tx * map_gen.tile_size
-				ey = ty * map_gen.tile_size
-				
-				enemies.append(
-					cls(
-						ex,
-						ey,
-						hp=20,
-						speed=40.0,
-						image_path="Assets/enemy_kyuri.png",
-						tile_size=map_gen.tile_size,
-					)
-				)
-		return enemies
+				tx = rng.randint(max(room.left + 1, 0), max(room.right - 2, room.left))
+				ty = rng.randint(max(room.top + 1, 0), max(room.bottom - 2, room.top))
+				# 同じタイルに重ねない
+				if (tx, ty) not in used:
+					used.add((tx, ty))
+					positions.append((tx, ty))
+		return positions
 
 	def draw(self, surface: pygame.Surface, camera_x: int = 0, camera_y: int = 0) -> None:
 		"""敵を描画する。カメラオフセットに対応。"""
@@ -97,65 +147,3 @@ class Enemy:
 	@property
 	def rect(self) -> pygame.Rect:
 		return self._rect
-
-	def move_towards_player(
-		self,
-		player_tile_x: int,
-		player_tile_y: int,
-		map_gen,
-		occupied: Optional[set] = None,
-	) -> bool:
-		"""
-		プレイヤーへの直線距離（ユークリッド距離）を最小化する隣接タイルへ1マスだけ移動する。
-
-		四方向（上下左右）のうち、通行可能（map_gen.tilemap == 1）で
-		プレイヤーへの距離が現在より小さくなるタイルを選ぶ。
-		"""
-		# 敵の現在タイル座標（ピクセル座標 -> タイル座標）
-		start_tx = int(self.x) // self.tile_size
-		start_ty = int(self.y) // self.tile_size
-
-		ptx = int(player_tile_x)
-		pty = int(player_tile_y)
-
-		# 既に同じタイルなら何もしない
-		if (start_tx, start_ty) == (ptx, pty):
-			return
-
-		width = map_gen.width
-		height = map_gen.height
-
-		# 現在の二乗距離（sqrtは不要）
-		curr_ds = (start_tx - ptx) * (start_tx - ptx) + (start_ty - pty) * (start_ty - pty)
-
-		# 四方向を候補として距離でソートし、occupied に入っていない最良候補を選ぶ
-		dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-		candidates = []
-		for dx, dy in dirs:
-			nx = start_tx + dx
-			ny = start_ty + dy
-			if 0 <= nx < width and 0 <= ny < height:
-				if map_gen.tilemap[nx][ny] == 1:
-					ds = (nx - ptx) * (nx - ptx) + (ny - pty) * (ny - pty)
-					candidates.append((ds, (nx, ny)))
-
-		if not candidates:
-			return False
-
-		candidates.sort(key=lambda x: x[0])
-
-		occ = occupied or set()
-
-		for _, (nx, ny) in candidates:
-			# プレイヤーや他の敵と重ならないようにチェック
-			if (nx, ny) in occ:
-				continue
-			# 移動実行
-			self.x = nx * self.tile_size
-			self.y = ny * self.tile_size
-			self._rect.topleft = (int(self.x), int(self.y))
-			return True
-
-		# 有効な候補が見つからなかった
-		return False
-
@@ -0,0 +1,366 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from arrays import grow_arrays
+from enemy import Enemy, greedy_step
+from occupancy import OccupancyGrid
+
+# 敵の状態 (EnemyPool.state の値)
+STATE_IDLE = 0     # プレイヤーへの距離場の外にいる
+STATE_CHASING = 1  # 距離場に沿ってプレイヤーを追っている
+STATE_ASLEEP = 2   # 遠くにいるので、プレイヤーが同じ部屋に入るまで動かない (ai_lod.AILodScheduler)
+
+ENEMY_HP = 20
+ENEMY_IMAGE = "Assets/enemy_kyuri.png"
+
+# 上下左右 (右・左・下・上。enemy.greedy_step と同じ順)
+_DX = np.array([1, -1, 0, 0], dtype=np.int64)
+_DY = np.array([0, 0, 1, -1], dtype=np.int64)
+_UNREACHABLE = np.iinfo(np.int32).max
+
+
+class EnemyPool:
+    """
+    1フロア分の敵をまとめて持つクラス
+
+    敵ごとに Python オブジェクトを作らず、タイル座標・HP・状態を numpy 配列で持つ。
+    ターンの更新 (step_along)・画面内の抽出 (visible)・ダメージ (damage) はまとめて計算するので、
+    敵が数千体いてもターンの処理がフレームを圧迫しない。
+
+    スロット番号 (0 から順に割り当てる整数) で敵を指し、OccupancyGrid にもスロット番号で登録する。
+    1体ずつ扱いたい場合は view() / for 文で Enemy と同じ属性を持つ EnemyView を受け取れる。
+    """
+
+    def __init__(self, tile_size: int, hp: int = ENEMY_HP, image_path: Optional[str] = ENEMY_IMAGE, capacity: int = 64):
+        self.tile_size = tile_size
+        self.default_hp = hp
+        self.count = 0  # 使用済みのスロット数（倒された敵のスロットも含む）
+
+        capacity = max(1, capacity)
+        self.tile_x = np.zeros(capacity, dtype=np.int32)
+        self.tile_y = np.zeros(capacity, dtype=np.int32)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.max_hp = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.state = np.zeros(capacity, dtype=np.uint8)
+
+        # 全ての敵で同じ画像を共有する
+        self.image = Enemy._load_image(image_path, tile_size) if image_path else None
+
+    _FIELDS = ("tile_x", "tile_y", "hp", "max_hp", "alive", "state")
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[Tuple[int, int]], tile_size: int) -> "EnemyPool":
+        """指定したタイル座標に敵を生成したプールを作る"""
+        pool = cls(tile_size, capacity=len(positions))
+        pool.spawn(positions)
+        return pool
+
+    # --- 生成・登録 ---
+
+    def spawn(self, positions: Sequence[Tuple[int, int]], hp: Optional[int] = None) -> np.ndarray:
+        """positions の各タイルに敵を生成し、割り当てたスロット番号を返す"""
+        n = len(positions)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        grow_arrays(self, self._FIELDS, self.count + n)
+
+        slots = np.arange(self.count, self.count + n)
+        xy = np.asarray(positions, dtype=np.int32).reshape(n, 2)
+        hp = self.default_hp if hp is None else hp
+        self.tile_x[slots] = xy[:, 0]
+        self.tile_y[slots] = xy[:, 1]
+        self.hp[slots] = hp
+        self.max_hp[slots] = hp
+        self.alive[slots] = True
+        self.state[slots] = STATE_IDLE
+        self.count += n
+        return slots
+
+    def clear(self):
+        """全ての敵を消す"""
+        self.alive[:] = False
+        self.count = 0
+
+    def register(self, occupancy):
+        """生きている全ての敵を占有グリッドに登録する（フロアに入ったとき）"""
+        for i in self.alive_indices():
+            occupancy.add(int(i), (int(self.tile_x[i]), int(self.tile_y[i])))
+
+    # --- 参照 ---
+
+    def alive_indices(self) -> np.ndarray:
+        """生きている敵のスロット番号"""
+        return np.flatnonzero(self.alive[:self.count])
+
+    def tile_pos(self, i: int) -> Tuple[int, int]:
+        return int(self.tile_x[i]), int(self.tile_y[i])
+
+    def rect(self, i: int) -> pygame.Rect:
+        """スロット i の敵のワールド座標の矩形"""
+        ts = self.tile_size
+        return pygame.Rect(int(self.tile_x[i]) * ts, int(self.tile_y[i]) * ts, ts, ts)
+
+    def view(self, i: int) -> "EnemyView":
+        return EnemyView(self, int(i))
+
+    def __iter__(self) -> Iterator["EnemyView"]:
+        return (EnemyView(self, int(i)) for i in self.alive_indices())
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def mask_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """タイル範囲 [x0, x1) x [y0, y1) にいる生きた敵のマスク (長さ count)"""
+        tx = self.tile_x[:self.count]
+        ty = self.tile_y[:self.count]
+        return self.alive[:self.count] & (tx >= x0) & (tx < x1) & (ty >= y0) & (ty < y1)
+
+    def visible(self, camera_x: int, camera_y: int, screen_w: int, screen_h: int) -> np.ndarray:
+        """画面に映っている生きた敵のスロット番号"""
+        ts = self.tile_size
+        x0 = camera_x // ts
+        y0 = camera_y // ts
+        x1 = (camera_x + screen_w + ts - 1) // ts
+        y1 = (camera_y + screen_h + ts - 1) // ts
+        return np.flatnonzero(self.mask_in_rect(x0, y0, x1, y1))
+
+    # --- 更新 ---
+
+    def damage(self, mask: np.ndarray, amount: int, occupancy=None) -> np.ndarray:
+        """
+        mask (長さ count) が True の生きた敵に amount のダメージを与える
+
+        倒された敵のスロット番号を返す。occupancy を渡すと倒された敵の登録を消す。
+        """
+        hit = np.asarray(mask, dtype=bool)[:self.count] & self.alive[:self.count]
+        self.hp[:self.count][hit] -= amount
+        killed = np.flatnonzero(hit & (self.hp[:self.count] <= 0))
+        self.alive[killed] = False
+        if occupancy is not None:
+            for i in killed:
+                occupancy.remove(int(i))
+        return killed
+
+    def field_distance(self, flow_field) -> np.ndarray:
+        """各スロットの敵から距離場の目標までの歩数 (長さ count。距離場の外・到達できない場合は -1)"""
+        ox, oy = flow_field.origin
+        w, h = flow_field.dist.shape
+        lx = self.tile_x[:self.count].astype(np.int64) - ox
+        ly = self.tile_y[:self.count].astype(np.int64) - oy
+        inside = (lx >= 0) & (lx < w) & (ly >= 0) & (ly < h)
+        out = np.full(self.count, -1, dtype=np.int32)
+        out[inside] = flow_field.dist[lx[inside], ly[inside]]
+        return out
+
+    def step_along(self, flow_field, map_gen, occupancy=None, active: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        全ての敵を距離場 (map_gen.flow_field() の結果) に沿って1マスずつ進め、移動した敵のスロット番号を返す
+
+        active (長さ count のマスク) を渡すと、True の敵だけを動かす（他の敵はその場にとどまり、壁として扱う）。
+
+        - 目標 (プレイヤーのタイル) と他の敵のいるタイルには入らない
+        - 同じタイルを狙う敵が複数いる場合は目標に近い敵を優先し、
+          空いたタイルには後ろの敵が同じターンのうちに詰める
+        - 距離場の外にいる敵は従来どおり直線距離で近づく (1体ずつ処理)
+
+        occupancy を渡すと移動した敵の分だけ位置を更新する。
+        """
+        idx = self.alive_indices()
+        if idx.size == 0:
+            return idx
+
+        ox, oy = flow_field.origin
+        w, h = flow_field.dist.shape
+        # 境界チェックを省くため、距離場と占有マップを1マス広げる
+        dist = np.full((w + 2, h + 2), -1, dtype=np.int32)
+        dist[1:-1, 1:-1] = flow_field.dist
+
+        px = self.tile_x[idx].astype(np.int64) - ox + 1
+        py = self.tile_y[idx].astype(np.int64) - oy + 1
+        inside = (px >= 1) & (px <= w) & (py >= 1) & (py <= h)
+        current = np.full(idx.size, -1, dtype=np.int32)
+        current[inside] = dist[px[inside], py[inside]]
+
+        # 占有マップと、各タイルにいる敵 (idx の行番号, いなければ -1)
+        occupied = np.zeros((w + 2, h + 2), dtype=bool)
+        owner = np.full((w + 2, h + 2), -1, dtype=np.int64)
+        rows_inside = np.flatnonzero(inside)
+        occupied[px[rows_inside], py[rows_inside]] = True
+        owner[px[rows_inside], py[rows_inside]] = rows_inside
+        tx, ty = flow_field.target
+        if 0 <= tx - ox < w and 0 <= ty - oy < h:
+            occupied[tx - ox + 1, ty - oy + 1] = True
+
+        ticked = np.ones(idx.size, dtype=bool) if active is None else np.asarray(active, dtype=bool)[idx]
+        chasing = (current > 0) & ticked
+        self.state[idx[ticked]] = np.where(chasing[ticked], STATE_CHASING, STATE_IDLE)
+
+        # 距離場の中にいる敵: 「希望のタイルを決める → 衝突を解決する」を繰り返す。
+        # 2回目以降は、前の回で空いたタイルの隣にいる敵と、衝突で負けた敵だけを調べ直す
+        pending = chasing.copy()
+        active = np.flatnonzero(chasing)
+        moved: List[np.ndarray] = []
+        while active.size:
+            nx = px[active, None] + _DX
+            ny = py[active, None] + _DY
+            nd = dist[nx, ny]
+            valid = (nd >= 0) & (nd < current[active, None]) & ~occupied[nx, ny]
+            choice = np.argmin(np.where(valid, nd, _UNREACHABLE), axis=1)
+            rows = np.flatnonzero(valid[np.arange(active.size), choice])
+            if rows.size == 0:
+                break
+
+            target_x = nx[rows, choice[rows]]
+            target_y = ny[rows, choice[rows]]
+            # 同じタイルを狙う敵のうち、目標に近い (同じならスロット番号の小さい) 敵だけが進む
+            target_key = target_x * (h + 2) + target_y
+            order = np.lexsort((active[rows], current[active[rows]], target_key))
+            first = np.ones(order.size, dtype=bool)
+            first[1:] = target_key[order[1:]] != target_key[order[:-1]]
+            win = order[first]
+            lose = order[~first]
+
+            movers = active[rows[win]]
+            old_x = px[movers]
+            old_y = py[movers]
+            occupied[old_x, old_y] = False
+            owner[old_x, old_y] = -1
+            px[movers] = target_x[win]
+            py[movers] = target_y[win]
+            occupied[px[movers], py[movers]] = True
+            owner[px[movers], py[movers]] = movers
+            current[movers] = dist[px[movers], py[movers]]
+            # 1ターンに進めるのは1マスだけ
+            pending[movers] = False
+            moved.append(movers)
+
+            neighbors = owner[old_x[:, None] + _DX, old_y[:, None] + _DY].ravel()
+            active = np.unique(np.concatenate([neighbors[neighbors >= 0], active[rows[lose]]]))
+            active = active[pending[active]]
+
+        moved_rows = np.concatenate(moved) if moved else np.zeros(0, dtype=np.int64)
+        movers = idx[moved_rows]
+        self.tile_x[movers] = px[moved_rows] - 1 + ox
+        self.tile_y[movers] = py[moved_rows] - 1 + oy
+        if occupancy is not None:
+            for i in movers:
+                occupancy.move(int(i), self.tile_pos(i))
+
+        # 距離場の外にいる敵 (巨大ワールドで遠くにいる敵)
+        outside = idx[(current < 0) & ticked]
+        if outside.size == 0:
+            return movers
+        if occupancy is None:
+            occupancy = OccupancyGrid()
+            self.register(occupancy)
+        stepped = [i for i in outside if self._greedy_step(int(i), flow_field.target, map_gen, occupancy)]
+        return np.concatenate([movers, np.array(stepped, dtype=np.int64)])
+
+    def step_to(self, i: int, goal: Tuple[int, int], planner, occupancy) -> bool:
+        """
+        スロット i の敵を goal へのキャッシュ済み経路 (map_engine.pathfinding.PathPlanner) に沿って1マス進める
+
+        巡回地点や逃走先など、プレイヤー以外の目標に向かう敵用。経路はスロット番号をキーにキャッシュする。
+        経路がない・ふさがれている・今ターンの探索予算が尽きた場合は移動しない。
+        他の敵のいるタイルには入らず、移動したら occupancy の登録も移す。
+        倒された敵の経路は planner.forget(i) で捨てること。
+        """
+        i = int(i)
+        step = planner.next_step(i, self.tile_pos(i), goal, occupancy)
+        if step is None or step in occupancy:
+            return False
+        self.tile_x[i], self.tile_y[i] = step
+        occupancy.move(i, step)
+        return True
+
+    def _greedy_step(self, i: int, target: Tuple[int, int], map_gen, occupancy) -> bool:
+        """直線距離が最も縮まる空いた床のタイルへ1マス進む (enemy.greedy_step の規則)"""
+        tile = greedy_step(self.tile_pos(i), target, map_gen, occupancy)
+        if tile is None:
+            return False
+        self.tile_x[i], self.tile_y[i] = tile
+        occupancy.move(i, tile)
+        return True
+
+    # --- 描画 ---
+
+    def draw(self, surface: pygame.Surface, camera_x: int = 0, camera_y: int = 0):
+        """画面に映っている敵だけをまとめて描画する"""
+        idx = self.visible(camera_x, camera_y, *surface.get_size())
+        if idx.size == 0:
+            return
+        ts = self.tile_size
+        xs = (self.tile_x[idx] * ts - camera_x).tolist()
+        ys = (self.tile_y[idx] * ts - camera_y).tolist()
+        if self.image:
+            surface.blits([(self.image, pos) for pos in zip(xs, ys)], doreturn=False)
+        else:
+            # フォールバック: シンプルな矩形
+            for x, y in zip(xs, ys):
+                pygame.draw.rect(surface, (200, 50, 50), (x, y, ts, ts))
+
+
+class EnemyView:
+    """
+    EnemyPool の1体分を Enemy と同じ属性で参照するためのビュー
+
+    値はプールの配列に直接読み書きする（ビュー自体は状態を持たない）。
+    """
+
+    __slots__ = ("pool", "index")
+
+    def __init__(self, pool: EnemyPool, index: int):
+        self.pool = pool
+        self.index = index
+
+    @property
+    def tile_size(self) -> int:
+        return self.pool.tile_size
+
+    @property
+    def x(self) -> int:
+        return int(self.pool.tile_x[self.index]) * self.pool.tile_size
+
+    @property
+    def y(self) -> int:
+        return int(self.pool.tile_y[self.index]) * self.pool.tile_size
+
+    @property
+    def hp(self) -> int:
+        return int(self.pool.hp[self.index])
+
+    @hp.setter
+    def hp(self, value: int):
+        self.pool.hp[self.index] = value
+
+    @property
+    def max_hp(self) -> int:
+        return int(self.pool.max_hp[self.index])
+
+    @property
+    def alive(self) -> bool:
+        return bool(self.pool.alive[self.index])
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return self.pool.rect(self.index)
+
+    def tile_pos(self) -> Tuple[int, int]:
+        return self.pool.tile_pos(self.index)
+
+    def draw(self, surface: pygame.Surface, camera_x: int = 0, camera_y: int = 0) -> None:
+        screen_x = self.x - camera_x
+        screen_y = self.y - camera_y
+        if self.pool.image:
+            surface.blit(self.pool.image, (screen_x, screen_y))
+        else:
+            pygame.draw.rect(surface, (200, 50, 50), (screen_x, screen_y, self.tile_size, self.tile_size))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, EnemyView) and other.pool is self.pool and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.pool), self.index))
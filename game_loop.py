@@ -0,0 +1,77 @@
+import pygame
+
+# update() に渡す dt の単位（60fps の1フレームを 1.0 とする。Trap.update などの従来の単位）
+REFERENCE_HZ = 60
+
+
+class GameLoop:
+    """
+    固定タイムステップのゲームループのスケジューラ
+
+    描画は1フレームに1回、シミュレーション（入力・敵のターン・罠・エフェクト）は step_hz の固定間隔で進める。
+    1フレームに何ステップ進めるかは tick() が経過時間から決めるので、
+    描画が 30 / 60 / 144 Hz のどれでもゲームの進み方は変わらない。
+
+        loop = GameLoop(step_hz=60, max_fps=144)
+        while running:
+            for _ in range(loop.tick()):
+                ...  # シミュレーションを loop.step_scale だけ進める
+            ...      # loop.ahead だけ先に進めた位置で描画する
+
+    処理落ちでステップが溜まりすぎたときは max_steps_per_frame で打ち切り、残りは捨てる
+    （追いつこうとしてさらに遅くなるのを防ぐ）。
+    """
+
+    def __init__(self, step_hz: int = REFERENCE_HZ, max_fps: int = 60, max_steps_per_frame: int = 5):
+        """
+        Args:
+            step_hz: シミュレーションの更新頻度
+            max_fps: 描画フレームレートの上限（0 で上限なし）
+            max_steps_per_frame: 1フレームで進めるステップ数の上限
+        """
+        self.step_hz = step_hz
+        self.max_fps = max_fps
+        self.max_steps_per_frame = max(1, max_steps_per_frame)
+        self.step_seconds = 1.0 / step_hz
+        # 1ステップが 60fps の何フレーム分か（update() に渡す dt）
+        self.step_scale = REFERENCE_HZ / step_hz
+
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0.0  # まだシミュレーションに反映していない経過時間（秒）
+        self.frame_seconds = 0.0  # 直前のフレームの経過時間（秒）
+        self.steps = 0  # 直前のフレームで進めたステップ数
+        self.total_steps = 0
+        self.dropped_seconds = 0.0  # 打ち切って捨てた時間の合計
+
+    def tick(self) -> int:
+        """
+        フレームの始めに1回呼ぶ
+
+        フレームレートの上限まで待ってから経過時間を溜め、このフレームで進めるステップ数を返す。
+        """
+        self.frame_seconds = self.clock.tick(self.max_fps) / 1000.0
+        self.accumulator += self.frame_seconds
+
+        steps = int(self.accumulator / self.step_seconds)
+        if steps > self.max_steps_per_frame:
+            self.dropped_seconds += (steps - self.max_steps_per_frame) * self.step_seconds
+            steps = self.max_steps_per_frame
+            self.accumulator = self.step_seconds * steps + self.accumulator % self.step_seconds
+        self.accumulator -= steps * self.step_seconds
+        self.steps = steps
+        self.total_steps += steps
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """最後のステップから次のステップまでのどこを描画しているか（0.0〜1.0）"""
+        return min(1.0, self.accumulator / self.step_seconds)
+
+    @property
+    def ahead(self) -> float:
+        """最後のステップからの経過時間（update() の dt と同じ単位）。描画の補間に使う"""
+        return self.alpha * self.step_scale
+
+    def get_fps(self) -> float:
+        """描画のフレームレート"""
+        return self.clock.get_fps()
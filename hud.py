@@ -0,0 +1,98 @@
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+
+class _HudText:
+    """HUD の1行（値が変わったときだけ描き直す）"""
+
+    def __init__(self, font: pygame.font.Font, pos: Tuple[int, int], color, fmt: str):
+        self.font = font
+        self.pos = pos
+        self.color = color
+        self.fmt = fmt
+        self.values: Optional[tuple] = None
+        self.surface: Optional[pygame.Surface] = None
+
+    def set(self, values: tuple) -> bool:
+        """値を設定する。値が変わって描き直した場合は True"""
+        if values == self.values and self.surface is not None:
+            return False
+        self.values = values
+        self.surface = self.font.render(self.fmt.format(*values), True, self.color)
+        return True
+
+
+class Hud:
+    """
+    画面左上の HUD（操作説明・タイル情報・トラップ数・階層）
+
+    フォントは大きさごとに1度だけ作り、各行は set() で渡された値が変わったときだけ描き直す。
+    全ての行を1枚の Surface にまとめておき、draw() はそれを1回 blit するだけ。
+    version は見た目が変わるたびに増えるので、DirtyRectRenderer の state に使える。
+    """
+
+    def __init__(self):
+        self._fonts: Dict[int, pygame.font.Font] = {}
+        self._texts: Dict[str, _HudText] = {}
+        self._surface: Optional[pygame.Surface] = None
+        self._rect = pygame.Rect(0, 0, 0, 0)
+        self._stale = True
+        self.version = 0
+
+    def font(self, size: int) -> pygame.font.Font:
+        """大きさ size のデフォルトフォント（1度だけ作る）"""
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def add(self, name: str, pos: Tuple[int, int], size: int, color, fmt: str = "{}"):
+        """
+        行を追加する
+
+        Args:
+            name: set() で指定する名前
+            pos: 画面上の左上の位置
+            fmt: 表示する文字列の書式（set() の値を format する）。値を取らない固定の文字列でもよい
+        """
+        text = self._texts[name] = _HudText(self.font(size), pos, color, fmt)
+        if "{" not in fmt:
+            text.set(())
+        self._stale = True
+
+    def set(self, name: str, *values) -> bool:
+        """行の値を設定する（前と同じ値なら何もしない）。描き直した場合は True"""
+        if self._texts[name].set(values):
+            self._stale = True
+            return True
+        return False
+
+    def _rebuild(self):
+        """全ての行を1枚の Surface にまとめ直す"""
+        rects = [t.surface.get_rect(topleft=t.pos) for t in self._texts.values() if t.surface is not None]
+        if not rects:
+            self._surface = None
+            self._rect = pygame.Rect(0, 0, 0, 0)
+        else:
+            self._rect = rects[0].unionall(rects[1:])
+            self._surface = pygame.Surface(self._rect.size, pygame.SRCALPHA)
+            for text in self._texts.values():
+                if text.surface is not None:
+                    self._surface.blit(text.surface, (text.pos[0] - self._rect.x, text.pos[1] - self._rect.y))
+        self._stale = False
+        self.version += 1
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """HUD 全体の画面上の矩形"""
+        if self._stale:
+            self._rebuild()
+        return self._rect
+
+    def draw(self, surface: pygame.Surface):
+        """HUD を描画"""
+        if self._stale:
+            self._rebuild()
+        if self._surface is not None:
+            surface.blit(self._surface, self._rect.topleft)
@@ -6,38 +6,126 @@ from typing import List, Tuple
 
 # パッケージ内のクラスをインポート
 from map_engine.map_generator import MapGenerator
+from map_engine.chunked_world import ChunkedWorld
+from map_engine.seeding import derive_seed, floor_seed, new_run_seed
 from Trap import Trap
 from Trapmanager import TrapManager
 from Title import TitleScreen
 from Player_parameter import Player_Parameter
+from renderer import DirtyRectRenderer
+from preloader import FloorPreloader
+from startup import StartupPipeline
+from game_loop import GameLoop
+from hud import Hud
+from profiler import FrameProfiler
+from occupancy import OccupancyGrid
+from ai_lod import AILodScheduler
+from sprite_cache import shared_cache
 
 from enemy import Enemy
+from enemy_pool import EnemyPool, ENEMY_IMAGE
+from Stairs import Stairs
 
 # MapGenerator内で定義されているデフォルトサイズを取得
 DEFAULT_TILE_SIZE = 48 
 # 部屋ごとの敵数（ここを変更して1部屋あたりの敵数を制御）
 ENEMIES_PER_ROOM = 2
+# 1フロアあたりのトラップ数
+TRAP_COUNT = 30
+# 巨大ワールドモード（区画を近づいたときに生成する CHUNKED_WORLD_SIZE x CHUNKED_WORLD_SIZE のマップ）
+CHUNKED_WORLD = False
+CHUNKED_WORLD_SIZE = 5000
+# 変化した領域だけを画面に送る描画モード（False で毎フレーム全画面を描画）
+DIRTY_RECT_RENDERING = True
+# シミュレーション（入力・敵のターン・罠・エフェクト）の更新頻度と、描画のフレームレートの上限（0 で上限なし）
+SIMULATION_HZ = 60
+MAX_FPS = 60
+# フレームの処理時間をフェーズごとに計測する（F3: 一覧の表示切り替え, F4: 書き出し）
+PROFILING = True
 
 
-def main():
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+def generate_floor(map_gen: MapGenerator, trap_manager: TrapManager, preloader: FloorPreloader,
+                   run_seed: int, floor_number: int):
+    """
+    ランのシードと階層番号のフロアに切り替え、次の階層の先読みを始める
     
-    pygame.init()
-    screen = pygame.display.set_mode((1000, 700)) 
-    pygame.display.set_caption(".pngへの道")
-    clock = pygame.time.Clock()
-    Cat = Player_Parameter()
+    先読み済みなら差し替えるだけで終わる。同じ run_seed / floor_number なら必ず同じフロアになる。
     
-    # タイトル画面を表示
-    title_screen = TitleScreen(screen_width=1000, screen_height=700)
-    title_screen.run(screen)
+    Returns:
+        (enemies, stairs)
+    """
+    if isinstance(map_gen, ChunkedWorld):
+        return generate_world_floor(map_gen, trap_manager, run_seed, floor_number)
     
-    try:
+    prepared = preloader.take(run_seed, floor_number)
+    map_gen.apply_layout(prepared.layout)
+    trap_manager.set_traps(prepared.traps)
+    enemies = EnemyPool.from_positions(prepared.enemy_positions, map_gen.tile_size)
+    
+    if hasattr(map_gen, 'stairs_pos') and map_gen.stairs_pos:
+        stairs = Stairs(map_gen.stairs_pos[0], map_gen.stairs_pos[1], DEFAULT_TILE_SIZE)
+    else:
+        last_room = map_gen.rooms[-1]
+        stairs = Stairs(last_room.centerx, last_room.centery, DEFAULT_TILE_SIZE)
+    
+    # 階段を降りたときに待たなくて済むよう、次の階層をワーカーで組み立てておく
+    preloader.prepare(run_seed, floor_number + 1)
+    return enemies, stairs
+
+
+def generate_world_floor(world: ChunkedWorld, trap_manager: TrapManager, run_seed: int, floor_number: int):
+    """
+    巨大ワールドモードのフロアを用意する
+    
+    区画は近づいたときに生成されるので、開始地点の周りだけを展開して敵とトラップを置く。
+    開始位置と階段の上にはトラップを置かず、開始位置には敵も置かない。
+    
+    Returns:
+        (enemies, stairs)
+    """
+    seed = floor_seed(run_seed, floor_number)
+    world.generate(derive_seed(seed, "map"))
+    world.stream(*world.start_pos())
+    cells = world.loaded_floor_cells()
+    stairs_x, stairs_y = world.far_room_center(random.Random(derive_seed(seed, "stairs")))
+    
+    trap_manager.set_traps(trap_manager.plan_traps_at(
+        cells, TRAP_COUNT, rng=random.Random(derive_seed(seed, "traps")),
+        exclude={world.start_pos(), (stairs_x, stairs_y)}
+    ))
+    enemies = EnemyPool.from_positions(
+        Enemy.spawn_positions(world, ENEMIES_PER_ROOM, rng=random.Random(derive_seed(seed, "enemies"))),
+        world.tile_size
+    )
+    return enemies, Stairs(stairs_x, stairs_y, DEFAULT_TILE_SIZE)
+
+
+def reset_occupancy(occupancy: OccupancyGrid, enemies: EnemyPool, player):
+    """新しいフロアの敵とプレイヤーで占有グリッドを作り直す"""
+    occupancy.clear()
+    enemies.register(occupancy)
+    occupancy.add(player, (player.tile_x, player.tile_y))
+
+
+def prepare_game(screen_size: Tuple[int, int], run_seed: int):
+    """
+    ゲーム開始の準備（タイトル画面の裏で StartupPipeline が少しずつ進める）
+    
+    タイルセット・キャラクター画像を読み込み、最初のフロアをワーカーで組み立て、
+    開始地点の周りのマップを事前描画しておく。Space を押した次のフレームからすぐ遊べる。
+    
+    Yields:
+        (進捗 0.0〜1.0, 説明)
+    Returns:
+        (map_gen, trap_manager, preloader, enemies, stairs, player)
+    """
+    from move import Player
+    
+    yield 0.0, "タイルセットを読み込んでいます"
+    if CHUNKED_WORLD:
+        map_gen = ChunkedWorld(width=CHUNKED_WORLD_SIZE, height=CHUNKED_WORLD_SIZE, tile_size=DEFAULT_TILE_SIZE)
+    else:
         map_gen = MapGenerator(width=50, height=50, tile_size=DEFAULT_TILE_SIZE) 
-    except (FileNotFoundError, RuntimeError) as e:
-        print(f"エラー: {e}")
-        pygame.quit()
-        sys.exit()
 
     FLOOR_TILESET_IDX = 0 
     FLOOR_TILE_IDX = 0
@@ -54,119 +142,205 @@ def main():
         WALL_TILESET_IDX, WALL_TILE_IDX
     )
     
-    # 初期マップ生成
-    map_gen.generate()
+    # 最初のフロアはワーカーで組み立て、その間に画像を読み込む
+    trap_manager = TrapManager(tile_size=DEFAULT_TILE_SIZE)
+    preloader = FloorPreloader(map_gen, trap_manager, TRAP_COUNT, ENEMIES_PER_ROOM)
+    if not CHUNKED_WORLD:
+        preloader.prepare(run_seed, 1)
+    
+    yield 0.3, "キャラクターを読み込んでいます"
+    player = Player(0, 0, tile_size=48)
+    yield 0.4, "キャラクターを読み込んでいます"
+    Enemy._load_image(ENEMY_IMAGE, DEFAULT_TILE_SIZE)
+    
+    if not CHUNKED_WORLD:
+        while not preloader.is_ready(run_seed, 1):
+            yield 0.5, "フロアを生成しています"
+    yield 0.7, "フロアを生成しています"
+    enemies, stairs = generate_floor(map_gen, trap_manager, preloader, run_seed, 1)
+    player.tile_x, player.tile_y = map_gen.start_pos()
+    
+    # 開始地点の周りのチャンクを事前描画しておく（最初のフレームで描かなくて済む）
+    yield 0.9, "マップを描画しています"
+    camera_x, camera_y = player.get_camera_pos(
+        800, 600,
+        map_gen.width * map_gen.tile_size,
+        map_gen.height * map_gen.tile_size
+    )
+    map_gen.draw(pygame.Surface(screen_size), camera_x, camera_y)
+    
+    return map_gen, trap_manager, preloader, enemies, stairs, player
+
 
-    enemies = Enemy.spawn(map_gen, ENEMIES_PER_ROOM)
+def main():
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    trap_manager = TrapManager(tile_size=DEFAULT_TILE_SIZE)
-    trap_manager.generate_traps(map_gen, trap_count=30)
+    pygame.init()
+    screen = pygame.display.set_mode((1000, 700)) 
+    pygame.display.set_caption(".pngへの道")
+    Cat = Player_Parameter()
+    
+    # ランのシード（python main.py <seed> で同じダンジョンを再現できる）
+    try:
+        run_seed = int(sys.argv[1]) if len(sys.argv) > 1 else new_run_seed()
+    except ValueError:
+        print(f"エラー: シードは整数で指定してください: {sys.argv[1]}")
+        print("使い方: python main.py [seed]")
+        pygame.quit()
+        sys.exit(1)
+    print(f"Run seed: {run_seed}")
+    
+    # タイトル画面を表示（その間にアセットの読み込みと最初のフロアの生成を進める）
+    pipeline = StartupPipeline(prepare_game(screen.get_size(), run_seed))
+    title_screen = TitleScreen(screen_width=1000, screen_height=700)
+    title_screen.run(screen, pipeline)
+    
+    try:
+        map_gen, trap_manager, preloader, enemies, stairs, player = pipeline.finish()
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"エラー: {e}")
+        pygame.quit()
+        sys.exit()
 
     camera_x = 0
     camera_y = 0
-
-    from Stairs import Stairs  # Stairsクラスのインポート
-    if hasattr(map_gen, 'stairs_pos') and map_gen.stairs_pos:
-        stairs = Stairs(map_gen.stairs_pos[0], map_gen.stairs_pos[1], DEFAULT_TILE_SIZE)
-    else:
-        last_room = map_gen.rooms[-1]
-        stairs = Stairs(last_room.centerx, last_room.centery, DEFAULT_TILE_SIZE)
     
-    from move import Player
-    player = Player(
-        map_gen.rooms[0].centerx,
-        map_gen.rooms[0].centery,
-        tile_size=48
-    )
+    # タイル -> キャラクターの索引（出現・移動したときだけ更新する）
+    occupancy = OccupancyGrid()
+    # 遠くの敵の AI を間引くスケジューラ
+    ai_scheduler = AILodScheduler()
+    reset_occupancy(occupancy, enemies, player)
     
     camera_speed = 10 
     show_traps = False
     current_floor = 1
     
+    renderer = DirtyRectRenderer(screen.get_size(), enabled=DIRTY_RECT_RENDERING)
+    
+    hud = Hud()
+    hud.add("controls", (10, 50), 24, (255, 255, 255), "SPACE: Regenerate | T: Toggle Traps | F3: Profiler")
+    hud.add("tiles", (10, 75), 20, (150, 200, 255), "Floor: TS{}[{}] | Wall: TS{}[{}]")
+    hud.add("traps", (10, 100), 20, (255, 255, 100), "Traps: {} ({})")
+    hud.add("floor", (10, 10), 24, (255, 255, 255), "Floor: {}")
+    
+    def draw_scene(surface: pygame.Surface):
+        """シーン全体を描画（renderer がクリップ領域を設定して呼ぶ）"""
+        with profiler.phase("map"):
+            surface.fill((0, 0, 0))
+            map_gen.draw(surface, camera_x, camera_y)
+
+        with profiler.phase("entities"):
+            enemies.draw(surface, camera_x, camera_y)
+
+            trap_manager.draw(surface, camera_x, camera_y, show_traps, loop.ahead)
+            stairs.draw(surface, camera_x, camera_y)
+            
+            player.draw(surface, camera_x, camera_y)
+        
+        with profiler.phase("hud"):
+            hud.draw(surface)
+        profiler.draw(surface)
+    
+    # 描画とシミュレーションを分けるスケジューラ
+    loop = GameLoop(step_hz=SIMULATION_HZ, max_fps=MAX_FPS)
+    # フェーズごとの処理時間の計測（F3 で一覧を表示、F4 で CSV / JSON に書き出し）
+    profiler = FrameProfiler(enabled=PROFILING)
+    
     running = True
     while running:
-        dt = clock.tick(60) / 16.0
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    # マップ再生成
-                    map_gen.generate()
-                    trap_manager.generate_traps(map_gen, trap_count=30)
-                    enemies = Enemy.spawn(map_gen, ENEMIES_PER_ROOM)
-                    
-                    # 階段を再生成
-                    if hasattr(map_gen, 'stairs_pos') and map_gen.stairs_pos:
-                        stairs = Stairs(map_gen.stairs_pos[0], map_gen.stairs_pos[1], DEFAULT_TILE_SIZE)
-                    else:
-                        last_room = map_gen.rooms[-1]
-                        stairs = Stairs(last_room.centerx, last_room.centery, DEFAULT_TILE_SIZE)
-                    
-                    current_floor = 1
-                    camera_x = 0
-                    camera_y = 0
-                    player.tile_x = map_gen.rooms[0].centerx
-                    player.tile_y = map_gen.rooms[0].centery
-                elif event.key == pygame.K_t:
-                    show_traps = not show_traps
-        
-        keys = pygame.key.get_pressed()
-        prev_px, prev_py = player.tile_x, player.tile_y
-        player.handle_input(keys, map_gen)
-
-        # プレイヤーが1タイル移動したら敵を1マス進める
-        if (player.tile_x, player.tile_y) != (prev_px, prev_py):
-            # 敵同士およびプレイヤーと重ならないように順次移動させる
-            # 初期 occupied は全ての敵のタイル座標とプレイヤーのタイル
-            occupied = set()
-            for ee in enemies:
-                etx = int(ee.x) // ee.tile_size
-                ety = int(ee.y) // ee.tile_size
-                occupied.add((etx, ety))
-            occupied.add((player.tile_x, player.tile_y))
-
-            for e in enemies:
-                # 自分の現在位置を一旦開放して移動を試みる
-                cur = (int(e.x) // e.tile_size, int(e.y) // e.tile_size)
-                if cur in occupied:
-                    occupied.remove(cur)
-
-                try:
-                    moved = e.move_towards_player(player.tile_x, player.tile_y, map_gen, occupied=occupied)
-                except Exception:
-                    moved = False
-
-                # 移動後の位置を占有セットに追加
-                new_pos = (int(e.x) // e.tile_size, int(e.y) // e.tile_size)
-                occupied.add(new_pos)
-        
-        # 階段との衝突判定
-        player_rect = pygame.Rect(
-            player.tile_x * player.tile_size,
-            player.tile_y * player.tile_size,
-            player.tile_size,
-            player.tile_size
-        )
+        # フレームレートの上限まで待ち、このフレームで進めるシミュレーションのステップ数を決める
+        steps = loop.tick()
+        profiler.begin_frame()
+
+        with profiler.phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        # 新しいシードでマップ再生成
+                        run_seed = new_run_seed()
+                        print(f"Run seed: {run_seed}")
+                        current_floor = 1
+                        enemies, stairs = generate_floor(map_gen, trap_manager, preloader, run_seed, current_floor)
+                        
+                        camera_x = 0
+                        camera_y = 0
+                        player.tile_x, player.tile_y = map_gen.start_pos()
+                        reset_occupancy(occupancy, enemies, player)
+                        renderer.request_full_redraw()
+                    elif event.key == pygame.K_t:
+                        show_traps = not show_traps
+                        renderer.request_full_redraw()
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
+                    elif event.key == pygame.K_F4:
+                        print(f"プロファイルを書き出しました: {profiler.export()}.csv / .json")
         
-        if stairs.check_collision(player_rect):
-            # 次の階層へ移動
-            current_floor += 1
-            map_gen.generate()
-            trap_manager.generate_traps(map_gen, trap_count=30)
-            enemies = Enemy.spawn(map_gen, ENEMIES_PER_ROOM)
+        # シミュレーションは固定間隔で進める（描画のフレームレートに左右されない）
+        for _ in range(steps):
+            keys = pygame.key.get_pressed()
+            prev_px, prev_py = player.tile_x, player.tile_y
+            with profiler.phase("input"):
+                player.handle_input(keys, map_gen, occupancy)
+
+            # プレイヤーが1タイル移動したら敵を1マス進める
+            if (player.tile_x, player.tile_y) != (prev_px, prev_py):
+                with profiler.phase("enemies"):
+                    # プレイヤーのタイルからの距離場を1度だけ作り、全ての敵がそれをたどる
+                    flow_field = map_gen.flow_field((player.tile_x, player.tile_y))
+                    
+                    # 敵同士およびプレイヤーと重ならないようにまとめて1マス進める（占有グリッドは動いた敵の分だけ更新する）
+                    # 遠くの敵は数ターンに1回だけ動かす／プレイヤーが同じ部屋に来るまで眠らせる
+                    active = ai_scheduler.select(enemies, flow_field, map_gen.rooms, (player.tile_x, player.tile_y),
+                                                 camera_x, camera_y, *screen.get_size())
+                    enemies.step_along(flow_field, map_gen, occupancy, active=active)
+                    profiler.note("ai", ai_scheduler.summary())
+            
+            # 階段との衝突判定
+            player_rect = pygame.Rect(
+                player.tile_x * player.tile_size,
+                player.tile_y * player.tile_size,
+                player.tile_size,
+                player.tile_size
+            )
+            
+            if stairs.check_collision(player_rect):
+                # 次の階層へ移動
+                current_floor += 1
+                enemies, stairs = generate_floor(map_gen, trap_manager, preloader, run_seed, current_floor)
+            
+                # プレイヤーを新しいマップの最初の部屋に配置
+                player.tile_x, player.tile_y = map_gen.start_pos()
+                reset_occupancy(occupancy, enemies, player)
+                renderer.request_full_redraw()
+            
+            # 巨大ワールドモードではプレイヤー周辺の区画を展開し、遠くの区画を保管に回す
+            if hasattr(map_gen, 'stream'):
+                map_gen.stream(player.tile_x, player.tile_y)
+            
+            # トラップとの衝突判定
+            with profiler.phase("traps"):
+                damage = trap_manager.check_collisions(player.get_rect())
+                if damage > 0:
+                    print(f"トラップ発動! ダメージ: {damage}")
+                    Cat.Trap_dmg(damage)
+                    if Cat.current_hp <= 0:
+                        print(f"GAME OVER")
+                        running = False
+                        break
+                trap_manager.update(loop.step_scale)
+            if player.tile_x == stairs.tile_x and player.tile_y == stairs.tile_y:
+                print(f"階段に到達! 次の階層へ（Floor {current_floor + 1}）")
+                current_floor += 1
             
-            # 階段を再生成
-            if hasattr(map_gen, 'stairs_pos') and map_gen.stairs_pos:
-                stairs = Stairs(map_gen.stairs_pos[0], map_gen.stairs_pos[1], DEFAULT_TILE_SIZE)
-            else:
-                last_room = map_gen.rooms[-1]
-                stairs = Stairs(last_room.centerx, last_room.centery, DEFAULT_TILE_SIZE)
+                # 新しいマップ・階段を生成
+                enemies, stairs = generate_floor(map_gen, trap_manager, preloader, run_seed, current_floor)
             
-            # プレイヤーを新しいマップの最初の部屋に配置
-            player.tile_x = map_gen.rooms[0].centerx
-            player.tile_y = map_gen.rooms[0].centery
+                # プレイヤーを最初の部屋に配置
+                player.tile_x, player.tile_y = map_gen.start_pos()
+                reset_occupancy(occupancy, enemies, player)
+                renderer.request_full_redraw()
         
         # カメラをプレイヤーに追従
         camera_x, camera_y = player.get_camera_pos(
@@ -174,67 +348,38 @@ def main():
             map_gen.width * map_gen.tile_size,
             map_gen.height * map_gen.tile_size
         )
-
-        # トラップとの衝突判定
-        damage = trap_manager.check_collisions(player.get_rect())
-        if damage > 0:
-            print(f"トラップ発動! ダメージ: {damage}")
-            Cat.Trap_dmg(damage)
-            if Cat.current_hp <= 0:
-                print(f"GAME OVER")
-                break
-        trap_manager.update(dt)
-        if player.tile_x == stairs.tile_x and player.tile_y == stairs.tile_y:
-            print(f"階段に到達! 次の階層へ（Floor {current_floor + 1}）")
-            current_floor += 1
-            
-            # 新しいマップを生成
-            map_gen.generate()
-            trap_manager.generate_traps(map_gen, trap_count=30)
-            
-            # 新しい階段を配置
-            if hasattr(map_gen, 'stairs_pos') and map_gen.stairs_pos:
-                stairs = Stairs(map_gen.stairs_pos[0], map_gen.stairs_pos[1], DEFAULT_TILE_SIZE)
-            else:
-                last_room = map_gen.rooms[-1]
-                stairs = Stairs(last_room.centerx, last_room.centery, DEFAULT_TILE_SIZE)
-            
-            # プレイヤーを最初の部屋に配置
-            player.tile_x = map_gen.rooms[0].centerx
-            player.tile_y = map_gen.rooms[0].centery
-        
-        screen.fill((0, 0, 0))
-        map_gen.draw(screen, camera_x, camera_y)
-
-        for e in enemies:
-            e.draw(screen, camera_x, camera_y)
-
-        trap_manager.draw(screen, camera_x, camera_y, show_traps)
-        stairs.draw(screen, camera_x, camera_y)
-        
-        player.draw(screen, camera_x, camera_y)
-        
-        font = pygame.font.Font(None, 24)
-        small_font = pygame.font.Font(None, 20)
-        text1 = font.render("SPACE: Regenerate | T: Toggle Traps", True, (255, 255, 255))
         
-        tile_info = (f"Floor: TS{map_gen.floor_tileset}[{map_gen.floor_tile}] | "
-                f"Wall: TS{map_gen.wall_tileset}[{map_gen.wall_tile}]")
-        text2 = small_font.render(tile_info, True, (150, 200, 255))
-        
-        trap_status = "Visible" if show_traps else "Invisible"
-        trap_text = small_font.render(f"Traps: {len(trap_manager.traps)} ({trap_status})", True, (255, 255, 100))
-
-        floor_text = font.render(f"Floor: {current_floor}", True, (255, 255, 255))
-
-        screen.blit(text1, (10, 50))
-        screen.blit(text2, (10, 75))
-        screen.blit(trap_text, (10, 100))
-        screen.blit(floor_text, (10, 10))  
+        # HUD は値が変わった行だけ描き直す
+        with profiler.phase("hud"):
+            hud.set("tiles", map_gen.floor_tileset, map_gen.floor_tile, map_gen.wall_tileset, map_gen.wall_tile)
+            hud.set("traps", len(trap_manager.traps), "Visible" if show_traps else "Invisible")
+            hud.set("floor", current_floor)
         
-        pygame.display.flip()
-        clock.tick(60)
+        # 変化した領域を登録して描画
+        renderer.begin_frame(camera_x, camera_y)
+        renderer.track("hud", hud.rect, state=hud.version)
+        renderer.track("player", player.get_rect().move(-camera_x, -camera_y), state=player.direction)
+        for i in enemies.visible(camera_x, camera_y, *screen.get_size()):
+            renderer.track(("enemy", int(i)), enemies.rect(i).move(-camera_x, -camera_y))
+        for effect in trap_manager.effects:
+            renderer.track(("effect", id(effect)), effect.get_rect().move(-camera_x, -camera_y),
+                           state=(effect.time, loop.ahead))
+        particle_rect = trap_manager.particles.get_rect(loop.ahead)
+        if particle_rect is not None:
+            renderer.track("particles", particle_rect.move(-camera_x, -camera_y),
+                           state=(trap_manager.particles.ticks, loop.ahead))
+        if profiler.visible:
+            # スプライトキャッシュの当たり具合（アルファの段階数・上限の調整用）
+            profiler.note("sprites", shared_cache().stats())
+        overlay_rect = profiler.get_rect(screen)
+        if overlay_rect is not None:
+            renderer.track("profiler", overlay_rect, state=profiler.version)
+        # 描画 (map / entities / hud) を除いた画面への転送の時間が flip になる
+        with profiler.phase("flip"):
+            renderer.present(screen, draw_scene)
+        profiler.end_frame()
     
+    preloader.shutdown()
     pygame.quit()
 
 
@@ -0,0 +1,29 @@
+# map_engine/chunk_cache.py
+from typing import Callable, Hashable, Optional
+
+import pygame
+
+from .lru_cache import LRUCache
+
+
+class ChunkCache(LRUCache):
+    """描画済みチャンク (Surface) を保持する LRU キャッシュ"""
+
+    def __init__(self, max_chunks: int = 16):
+        """
+        Args:
+            max_chunks: 保持するチャンク数の上限（超えたら最も古いものから破棄）
+        """
+        super().__init__(max_chunks)
+
+    def get(self, key: Hashable, builder: Callable[[], Optional[pygame.Surface]]) -> Optional[pygame.Surface]:
+        """
+        チャンクを取得する。未作成なら builder() で作成してキャッシュする。
+
+        builder は描画するものが無いチャンクに対して None を返してよい（None もキャッシュされる）。
+        """
+        return super().get(key, builder)
+
+    def clear(self):
+        """全てのチャンクを破棄（マップ再生成・タイル変更時に呼ぶ）"""
+        super().clear()
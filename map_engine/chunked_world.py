@@ -0,0 +1,340 @@
+# map_engine/chunked_world.py
+import random
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from .tile_selector import TileSelector, DEFAULT_TILE_SIZE
+from .chunk_cache import ChunkCache
+from .floor_layout import FloorLayout, FLOOR, RENDER_VOID, classify_cells
+from .distance_field import FlowField, bfs_distance
+from .map_generator import find_tileset_paths, render_cells
+from .seeding import derive_seed
+
+
+class Region:
+    """ワールドを region_size x region_size タイルに区切った1区画"""
+
+    def __init__(self, rx: int, ry: int, x0: int, y0: int, tilemap: np.ndarray, rooms: List[pygame.Rect]):
+        self.rx = rx
+        self.ry = ry
+        self.x0 = x0
+        self.y0 = y0
+        # tilemap[x - x0, y - y0] : 0=壁, 1=床
+        self.tilemap = tilemap
+        # 部屋 (ワールド座標)
+        self.rooms = rooms
+
+
+class _TilemapView:
+    """ChunkedWorld の tilemap[x][y] / tilemap[x, y] 互換アクセス"""
+
+    def __init__(self, world: "ChunkedWorld", x: Optional[int] = None):
+        self._world = world
+        self._x = x
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            return self._world.tile_at(x, y)
+        if self._x is None:
+            return _TilemapView(self._world, key)
+        return self._world.tile_at(self._x, key)
+
+
+class ChunkedWorld:
+    """
+    巨大な (または事実上無限の) ダンジョン用の、区画単位で遅延生成されるワールド
+
+    - 区画 (Region) はカメラ・プレイヤーが近づいたときに初めて生成する
+    - 区画の中身は (シード, 区画座標) だけで決まるので、どの順番で生成しても同じワールドになる
+    - 隣り合う区画は、境界ごとにシードから決まる出入口で通路がつながる
+    - 離れた区画は zlib で圧縮して保管し、メモリ使用量は探索した範囲に比例する
+
+    MapGenerator と同じく width / height / tile_size / tilemap[x][y] / is_floor() / draw() を持つ。
+    """
+
+    def __init__(self, width=5000, height=5000, tile_size=DEFAULT_TILE_SIZE,
+                 floor_tileset=0, floor_tile=0, wall_tileset=0, wall_tile=1,
+                 region_size=64, chunk_size=16, max_loaded_regions=64, max_chunks=16):
+        if region_size % chunk_size != 0:
+            raise ValueError("region_size は chunk_size の倍数にしてください")
+
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.region_size = region_size
+        self.rooms_per_region = (1, 2)
+        self.room_min_size = 6
+        self.room_max_size = 15
+
+        self.seed = None
+        self.max_loaded_regions = max(1, max_loaded_regions)
+        # 展開済みの区画 (LRU) と、圧縮して保管している区画
+        self._regions: "OrderedDict[Tuple[int, int], Region]" = OrderedDict()
+        self._store: Dict[Tuple[int, int], Tuple[bytes, Tuple[int, int], List[Tuple[int, int, int, int]]]] = {}
+
+        self.chunk_size = chunk_size
+        self.chunk_cache = ChunkCache(max_chunks)
+        self.tilemap = _TilemapView(self)
+
+        self.tile_selector = TileSelector(find_tileset_paths(), tile_size=tile_size)
+        self.floor_tileset = floor_tileset
+        self.floor_tile = floor_tile
+        self.wall_tileset = wall_tileset
+        self.wall_tile = wall_tile
+
+    def set_tiles(self, floor_tileset, floor_tile, wall_tileset, wall_tile):
+        """使用するタイルを設定する"""
+        self.floor_tileset = floor_tileset
+        self.floor_tile = floor_tile
+        self.wall_tileset = wall_tileset
+        self.wall_tile = wall_tile
+        self.chunk_cache.clear()
+
+    def generate(self, seed=None):
+        """
+        ワールドをリセットする（区画はまだ生成しない）
+
+        Args:
+            seed: 乱数シード。同じシード・同じ設定なら同じワールドになる（省略時はランダム）
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self._regions.clear()
+        self._store.clear()
+        self.chunk_cache.clear()
+
+    # --- 区画の管理 ---
+
+    @property
+    def regions_x(self) -> int:
+        return (self.width + self.region_size - 1) // self.region_size
+
+    @property
+    def regions_y(self) -> int:
+        return (self.height + self.region_size - 1) // self.region_size
+
+    @property
+    def rooms(self) -> List[pygame.Rect]:
+        """展開済みの区画にある部屋"""
+        return [room for region in self._regions.values() for room in region.rooms]
+
+    def region(self, rx: int, ry: int) -> Region:
+        """区画を取得する（未生成なら生成、保管中なら展開する）"""
+        key = (rx, ry)
+        region = self._regions.get(key)
+        if region is not None:
+            self._regions.move_to_end(key)
+            return region
+
+        stored = self._store.pop(key, None)
+        if stored is not None:
+            data, shape, rooms = stored
+            tilemap = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(shape).copy()
+            region = Region(rx, ry, rx * self.region_size, ry * self.region_size,
+                            tilemap, [pygame.Rect(r) for r in rooms])
+        else:
+            region = self._generate_region(rx, ry)
+
+        self._regions[key] = region
+        while len(self._regions) > self.max_loaded_regions:
+            self._evict(next(iter(self._regions)))
+        return region
+
+    def stream(self, tile_x: int, tile_y: int, radius: int = 32, keep_radius: int = 128):
+        """
+        プレイヤー (カメラ) の周囲の区画を展開し、遠くの区画を圧縮保管に回す
+
+        Args:
+            tile_x, tile_y: 中心のタイル座標
+            radius: この距離 (タイル) 以内の区画は展開しておく
+            keep_radius: この距離 (タイル) より遠い区画は保管に回す
+        """
+        rs = self.region_size
+        for rx in range(max(0, (tile_x - radius) // rs), min(self.regions_x, (tile_x + radius) // rs + 1)):
+            for ry in range(max(0, (tile_y - radius) // rs), min(self.regions_y, (tile_y + radius) // rs + 1)):
+                self.region(rx, ry)
+
+        for key, region in list(self._regions.items()):
+            dx = max(region.x0 - tile_x, tile_x - (region.x0 + rs), 0)
+            dy = max(region.y0 - tile_y, tile_y - (region.y0 + rs), 0)
+            if max(dx, dy) > keep_radius:
+                self._evict(key)
+
+    def _evict(self, key: Tuple[int, int]):
+        """区画を圧縮して保管に回す"""
+        region = self._regions.pop(key)
+        self._store[key] = (zlib.compress(region.tilemap.tobytes()), region.tilemap.shape,
+                            [tuple(r) for r in region.rooms])
+
+    def _region_bounds(self, rx: int, ry: int) -> Tuple[int, int, int, int]:
+        """区画のワールド座標での範囲 (x0, y0, 幅, 高さ)"""
+        x0 = rx * self.region_size
+        y0 = ry * self.region_size
+        return x0, y0, min(self.region_size, self.width - x0), min(self.region_size, self.height - y0)
+
+    def _door(self, kind: str, bx: int, by: int, length: int) -> int:
+        """
+        区画の境界にある出入口の位置（境界に沿ったオフセット）
+
+        境界の両側の区画が同じ値を得られるよう、境界そのもの (kind, bx, by) からシードを作る。
+        length は境界の実際の長さ（ワールドの端で区画が欠けている場合は region_size より短い）で、
+        両側の区画で同じ値になるので、出入口は必ず両側の区画の中に収まる。
+        """
+        rng = random.Random(derive_seed(self.seed, "door", kind, bx, by))
+        # 角から2マス以上離す（短い境界では中央寄りに詰める）
+        low = min(2, (length - 1) // 2)
+        return rng.randint(low, max(low, length - 3))
+
+    def _generate_region(self, rx: int, ry: int) -> Region:
+        """区画 (rx, ry) を生成する"""
+        x0, y0, w, h = self._region_bounds(rx, ry)
+        rng = random.Random(derive_seed(self.seed, "region", rx, ry))
+        # 区画内の座標で部屋と通路を掘る
+        layout = FloorLayout(w, h, self.chunk_size)
+
+        # 部屋（区画に入りきらない場合は中央を通路の合流点にする）
+        hubs: List[Tuple[int, int]] = []
+        max_w = min(self.room_max_size, w - 2)
+        max_h = min(self.room_max_size, h - 2)
+        if max_w >= self.room_min_size and max_h >= self.room_min_size:
+            for i in range(rng.randint(*self.rooms_per_region)):
+                rw = rng.randint(self.room_min_size, max_w)
+                rh = rng.randint(self.room_min_size, max_h)
+                room = pygame.Rect(rng.randint(1, w - rw - 1), rng.randint(1, h - rh - 1), rw, rh)
+                layout.rooms.append(room)
+                layout.carve_room(room)
+                if i > 0:
+                    layout.carve_corridor(layout.rooms[i - 1].center, room.center)
+                hubs.append(room.center)
+        else:
+            hubs.append((w // 2, h // 2))
+            layout.carve_room(pygame.Rect(w // 2, h // 2, 1, 1))
+
+        # 隣の区画への出入口（区画の端のセル）まで通路を伸ばす
+        doors = []
+        if x0 > 0:
+            doors.append((0, self._door("v", rx, ry, h)))
+        if x0 + w < self.width:
+            doors.append((w - 1, self._door("v", rx + 1, ry, h)))
+        if y0 > 0:
+            doors.append((self._door("h", rx, ry, w), 0))
+        if y0 + h < self.height:
+            doors.append((self._door("h", rx, ry + 1, w), h - 1))
+        for dx, dy in doors:
+            if 0 <= dx < w and 0 <= dy < h:
+                layout.carve_corridor(hubs[0], (dx, dy))
+                layout.carve_room(pygame.Rect(dx, dy, 1, 1))
+
+        rooms = [room.move(x0, y0) for room in layout.rooms]
+        return Region(rx, ry, x0, y0, layout.tilemap, rooms)
+
+    # --- タイルの参照 ---
+
+    def tile_at(self, x: int, y: int) -> int:
+        """タイルの値 (0=壁, 1=床)。必要なら区画を生成する"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0
+        region = self.region(x // self.region_size, y // self.region_size)
+        return int(region.tilemap[x - region.x0, y - region.y0])
+
+    def is_floor(self, x: int, y: int) -> bool:
+        """指定タイルが床かどうか (マップ範囲外は False)"""
+        return self.tile_at(x, y) == FLOOR
+
+    def block(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """[x0, x1) x [y0, y1) の範囲の tilemap を取り出す（マップ外は壁）"""
+        out = np.zeros((x1 - x0, y1 - y0), dtype=np.uint8)
+        rs = self.region_size
+        for rx in range(max(0, x0 // rs), min(self.regions_x, (x1 - 1) // rs + 1)):
+            for ry in range(max(0, y0 // rs), min(self.regions_y, (y1 - 1) // rs + 1)):
+                region = self.region(rx, ry)
+                rw, rh = region.tilemap.shape
+                sx0, sx1 = max(x0, region.x0), min(x1, region.x0 + rw)
+                sy0, sy1 = max(y0, region.y0), min(y1, region.y0 + rh)
+                if sx0 < sx1 and sy0 < sy1:
+                    out[sx0 - x0:sx1 - x0, sy0 - y0:sy1 - y0] = \
+                        region.tilemap[sx0 - region.x0:sx1 - region.x0, sy0 - region.y0:sy1 - region.y0]
+        return out
+
+    def flow_field(self, target: Tuple[int, int], radius: int = 32) -> FlowField:
+        """
+        target へ向かうための距離場 (敵の追跡用)
+
+        ワールド全体は大きすぎるので target の周り radius タイルだけを計算する。
+        範囲外の敵は距離場の距離が -1 になる（EnemyPool.step_along はそれらを直線的な追跡で動かす）。
+        """
+        tx, ty = int(target[0]), int(target[1])
+        x0, y0 = max(0, tx - radius), max(0, ty - radius)
+        x1, y1 = min(self.width, tx + radius + 1), min(self.height, ty + radius + 1)
+        dist = bfs_distance(self.block(x0, y0, x1, y1) == FLOOR, [(tx - x0, ty - y0)])
+        return FlowField(dist, (tx, ty), origin=(x0, y0))
+
+    def start_pos(self) -> Tuple[int, int]:
+        """開始位置（左上の区画の最初の部屋の中心）"""
+        region = self.region(0, 0)
+        if region.rooms:
+            return region.rooms[0].center
+        return self._hub_of(region)
+
+    def far_room_center(self, rng: random.Random) -> Tuple[int, int]:
+        """開始位置から遠い区画の部屋の中心（階段の配置用）"""
+        rx = rng.randint(self.regions_x // 2, self.regions_x - 1)
+        ry = rng.randint(self.regions_y // 2, self.regions_y - 1)
+        region = self.region(rx, ry)
+        if region.rooms:
+            return region.rooms[0].center
+        return self._hub_of(region)
+
+    def _hub_of(self, region: Region) -> Tuple[int, int]:
+        w, h = region.tilemap.shape
+        return region.x0 + w // 2, region.y0 + h // 2
+
+    def loaded_floor_cells(self) -> List[Tuple[int, int]]:
+        """展開済みの区画にある床タイルの座標"""
+        cells = []
+        for region in self._regions.values():
+            xs, ys = np.nonzero(region.tilemap == FLOOR)
+            cells.extend(zip((xs + region.x0).tolist(), (ys + region.y0).tolist()))
+        return cells
+
+    # --- 描画 ---
+
+    def draw(self, surface: pygame.Surface, camera_x=0, camera_y=0):
+        """マップを描画 (カメラオフセット対応) - 見えているチャンクだけを生成・描画する"""
+        screen_w, screen_h = surface.get_size()
+        chunk_px = self.chunk_size * self.tile_size
+        chunks_x = (self.width + self.chunk_size - 1) // self.chunk_size
+        chunks_y = (self.height + self.chunk_size - 1) // self.chunk_size
+
+        start_cx = max(0, camera_x // chunk_px)
+        end_cx = min(chunks_x, (camera_x + screen_w) // chunk_px + 1)
+        start_cy = max(0, camera_y // chunk_px)
+        end_cy = min(chunks_y, (camera_y + screen_h) // chunk_px + 1)
+
+        for cx in range(start_cx, end_cx):
+            for cy in range(start_cy, end_cy):
+                chunk = self.chunk_cache.get((cx, cy), lambda: self._render_chunk(cx, cy))
+                if chunk:
+                    surface.blit(chunk, (cx * chunk_px - camera_x, cy * chunk_px - camera_y))
+
+    def _render_chunk(self, cx: int, cy: int) -> Optional[pygame.Surface]:
+        """チャンク (cx, cy) を描画する。描画するセルがなければ None"""
+        start_x = cx * self.chunk_size
+        end_x = min(self.width, start_x + self.chunk_size)
+        start_y = cy * self.chunk_size
+        end_y = min(self.height, start_y + self.chunk_size)
+
+        # 壁面の判定に1行下まで必要
+        cells = classify_cells(self.block(start_x, start_y, end_x, end_y + 1))[:, :end_y - start_y]
+        if not (cells != RENDER_VOID).any():
+            return None
+
+        floor_tile = self.tile_selector.get_tile(self.floor_tileset, self.floor_tile)
+        wall_tile = self.tile_selector.get_tile(self.wall_tileset, self.wall_tile)
+        return render_cells(cells, floor_tile, wall_tile, self.tile_size)
@@ -0,0 +1,94 @@
+# map_engine/distance_field.py
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+def _padded(passable: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """周囲を通行不可で1マス囲んだ1次元配列と、4近傍へのオフセットを返す（境界チェックを省くため）"""
+    w, h = passable.shape
+    pad = np.zeros((w + 2, h + 2), dtype=bool)
+    pad[1:-1, 1:-1] = passable
+    stride = h + 2
+    offsets = np.array([1, -1, stride, -stride], dtype=np.int64)
+    return pad.ravel(), offsets
+
+
+def _flat_index(x: int, y: int, h: int) -> int:
+    """(x, y) を _padded() の1次元配列のインデックスにする"""
+    return (x + 1) * (h + 2) + (y + 1)
+
+
+def bfs_distance(passable: np.ndarray, sources: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    複数の起点からの BFS 距離場を計算する
+
+    波面ごとに numpy でまとめて展開するので、Python のループはステップ数 (最大距離) 回だけ。
+
+    Args:
+        passable: passable[x, y] が True のセルだけを通る
+        sources: 起点のタイル座標（通行不可のものは無視）
+
+    Returns:
+        dist[x, y] : 最も近い起点からの歩数。到達できないセルは -1
+    """
+    w, h = passable.shape
+    flat, offsets = _padded(passable)
+    dist = np.full(flat.size, -1, dtype=np.int32)
+
+    starts = [_flat_index(x, y, h) for x, y in sources
+              if 0 <= x < w and 0 <= y < h and passable[x, y]]
+    frontier = np.unique(np.array(starts, dtype=np.int64))
+    dist[frontier] = 0
+
+    step = 0
+    while frontier.size:
+        step += 1
+        neighbors = (frontier[:, None] + offsets).ravel()
+        neighbors = neighbors[flat[neighbors] & (dist[neighbors] < 0)]
+        frontier = np.unique(neighbors)
+        dist[frontier] = step
+
+    return dist.reshape(w + 2, h + 2)[1:-1, 1:-1].copy()
+
+
+def label_components(passable: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    通行可能なセルを4近傍でつながった領域ごとにラベル付けする
+
+    Returns:
+        (labels, count) : labels[x, y] は 1..count の領域番号。通行不可のセルは 0
+    """
+    w, h = passable.shape
+    flat, offsets = _padded(passable)
+    labels = np.zeros(flat.size, dtype=np.int32)
+
+    count = 0
+    remaining = np.flatnonzero(flat)
+    while remaining.size:
+        count += 1
+        frontier = remaining[:1]
+        labels[frontier] = count
+        while frontier.size:
+            neighbors = (frontier[:, None] + offsets).ravel()
+            neighbors = neighbors[flat[neighbors] & (labels[neighbors] == 0)]
+            frontier = np.unique(neighbors)
+            labels[frontier] = count
+        remaining = remaining[labels[remaining] == 0]
+
+    return labels.reshape(w + 2, h + 2)[1:-1, 1:-1].copy(), count
+
+
+class FlowField:
+    """
+    目標タイルへの BFS 距離場 (敵の追跡用)
+
+    各セルから距離が1つ小さい隣のセルへ進めば、壁を回り込んで最短経路で目標に着く
+    （全ての敵をまとめて進めるのは EnemyPool.step_along）。
+    巨大ワールドでは目標の周りだけを計算するので、距離場は origin からの部分領域になる。
+    """
+
+    def __init__(self, dist: np.ndarray, target: Tuple[int, int], origin: Tuple[int, int] = (0, 0)):
+        self.dist = dist
+        self.target = target
+        self.origin = origin
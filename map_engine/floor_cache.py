@@ -0,0 +1,63 @@
+# map_engine/floor_cache.py
+import threading
+import zlib
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .lru_cache import LRUCache
+
+
+class FloorCache:
+    """
+    生成済みフロア (tilemap + 部屋) を圧縮して保持する LRU キャッシュ
+
+    先読みスレッドとメインスレッドの両方から使われるのでロックで保護する。
+    """
+
+    def __init__(self, max_floors: int = 8):
+        """
+        Args:
+            max_floors: 保持するフロア数の上限（超えたら最も古いものから破棄）
+        """
+        # key -> (圧縮した tilemap, 配列の形, 部屋のリスト)
+        self._floors = LRUCache(max_floors)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[np.ndarray, List[Tuple[int, int, int, int]]]]:
+        """
+        フロアを取得する
+
+        Returns:
+            (tilemap, rooms) : tilemap は新しい配列、rooms は (x, y, w, h) のリスト。無ければ None
+        """
+        with self._lock:
+            entry = self._floors.lookup(key)
+        if entry is None:
+            return None
+
+        data, shape, rooms = entry
+        tilemap = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(shape).copy()
+        return tilemap, list(rooms)
+
+    def put(self, key: Hashable, tilemap: np.ndarray, rooms: List[Tuple[int, int, int, int]]):
+        """フロアを圧縮して保存する"""
+        data = zlib.compress(np.ascontiguousarray(tilemap, dtype=np.uint8).tobytes())
+        with self._lock:
+            self._floors.put(key, (data, tilemap.shape, [tuple(r) for r in rooms]))
+
+    def clear(self):
+        """全てのフロアを破棄"""
+        with self._lock:
+            self._floors.clear()
+
+    @property
+    def hits(self) -> int:
+        return self._floors.hits
+
+    @property
+    def misses(self) -> int:
+        return self._floors.misses
+
+    def __len__(self):
+        return len(self._floors)
@@ -0,0 +1,229 @@
+# map_engine/floor_layout.py
+import random
+from typing import Container, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from .distance_field import bfs_distance, label_components
+from .lru_cache import LRUCache
+
+# タイルの種類 (tilemap の値)
+WALL = 0
+FLOOR = 1
+
+# 描画用の分類 (render_map の値)
+RENDER_VOID = 0       # 何も描画しない
+RENDER_FLOOR = 1      # 床タイル
+RENDER_WALL_FACE = 2  # 床の上に立つ壁タイル
+
+
+def classify_cells(tilemap: np.ndarray) -> np.ndarray:
+    """
+    tilemap から描画用の分類 (床 / 壁面 / 空白) を計算する
+
+    最下行 (y = 高さ-1) は下のセルが分からないので壁面にはならない。
+    一部分だけを分類する場合は1行下まで含めて渡し、結果の最下行を捨てればよい。
+    """
+    is_floor = tilemap == FLOOR
+
+    render_map = np.zeros(tilemap.shape, dtype=np.uint8)
+    render_map[is_floor] = RENDER_FLOOR
+    # 壁(0)で、その下(y+1)が床(1)のセルは床の上に立つ壁
+    wall_face = ~is_floor[:, :-1] & is_floor[:, 1:]
+    render_map[:, :-1][wall_face] = RENDER_WALL_FACE
+    return render_map
+
+
+def _sample_indices(n: int, rng: random.Random) -> Iterator[int]:
+    """0..n-1 を重複なしのランダムな順で返す（必要な分だけ Fisher-Yates でシャッフルする）"""
+    swapped = {}
+    for j in range(n):
+        r = rng.randrange(j, n)
+        yield swapped.get(r, r)
+        swapped[r] = swapped.get(j, j)
+
+
+class FloorLayout:
+    """
+    1フロア分の生成結果 (tilemap・部屋・描画用の分類)
+
+    描画用の Surface を持たないので、別スレッドで組み立ててから
+    MapGenerator.apply_layout() で差し替えることができる。
+    """
+
+    def __init__(self, width: int, height: int, chunk_size: int = 16, seed=None,
+                 tilemap: Optional[np.ndarray] = None, rooms: Optional[List[pygame.Rect]] = None):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+        # tilemap[x, y] (tilemap[x][y] でも参照可) : 0=壁, 1=床
+        self.tilemap = tilemap if tilemap is not None else np.zeros((width, height), dtype=np.uint8)
+        self.rooms: List[pygame.Rect] = rooms if rooms is not None else []
+
+        # classify() で1度だけ計算する描画用の分類と、描画対象を含むチャンクの索引
+        self.render_map = np.zeros((width, height), dtype=np.uint8)
+        self.chunk_mask = np.zeros(self.chunk_grid_size(), dtype=bool)
+
+        # index() で1度だけ計算する到達可能性の索引
+        # components[x, y] : 床がつながった領域の番号 (壁は 0)
+        self.components = np.zeros((width, height), dtype=np.int32)
+        self.component_count = 0
+        # start_distance[x, y] : 開始位置からの歩数 (到達できないセルは -1)
+        self.start_distance = np.full((width, height), -1, dtype=np.int32)
+        self.stairs_pos: Optional[Tuple[int, int]] = None
+        # 床のセルの一覧 (N, 2) と、部屋ごとの床のセルの一覧 (敵・トラップの配置用)
+        self.floor_cells = np.zeros((0, 2), dtype=np.int32)
+        self.room_cells: List[np.ndarray] = []
+        # 開始位置以外を起点にした距離場 (起点 -> 距離場) のキャッシュ
+        self._fields = LRUCache(8)
+
+    def is_floor(self, x: int, y: int) -> bool:
+        """指定タイルが床かどうか (マップ範囲外は False)"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.tilemap[x, y] == FLOOR
+        return False
+
+    def carve_room(self, room: pygame.Rect):
+        """部屋の床を作成"""
+        self._carve_span(room.left, room.right, room.top, room.bottom)
+
+    def carve_corridor(self, start: Tuple[int, int], end: Tuple[int, int]):
+        """L字型の通路を作成 (横: start→end の手前まで, 縦: 曲がり角→end の手前まで)"""
+        x1, y1 = start
+        x2, y2 = end
+
+        # 横方向: x1 から x2 の手前まで (y = y1)
+        if x1 < x2:
+            self._carve_span(x1, x2, y1, y1 + 1)
+        elif x1 > x2:
+            self._carve_span(x2 + 1, x1 + 1, y1, y1 + 1)
+
+        # 縦方向: y1 から y2 の手前まで (x = x2)
+        if y1 < y2:
+            self._carve_span(x2, x2 + 1, y1, y2)
+        elif y1 > y2:
+            self._carve_span(x2, x2 + 1, y2 + 1, y1 + 1)
+
+    def _carve_span(self, x0: int, x1: int, y0: int, y1: int):
+        """[x0, x1) x [y0, y1) の範囲をマップ内にクリップして床にする"""
+        x0, x1 = max(x0, 0), min(x1, self.width)
+        y0, y1 = max(y0, 0), min(y1, self.height)
+        if x0 < x1 and y0 < y1:
+            self.tilemap[x0:x1, y0:y1] = FLOOR
+
+    def classify(self):
+        """
+        tilemap から描画用の分類 (床 / 壁面 / 空白) を計算する
+
+        tilemap を直接書き換えた場合はこのメソッドを呼び直すこと。
+        """
+        self.render_map = classify_cells(self.tilemap)
+
+        # チャンク単位で「描画するセルがあるか」をまとめる
+        chunks_x, chunks_y = self.chunk_grid_size()
+        cs = self.chunk_size
+        padded = np.zeros((chunks_x * cs, chunks_y * cs), dtype=bool)
+        padded[:self.width, :self.height] = self.render_map != RENDER_VOID
+        self.chunk_mask = padded.reshape(chunks_x, cs, chunks_y, cs).any(axis=(1, 3))
+
+    def start_pos(self) -> Optional[Tuple[int, int]]:
+        """プレイヤーの開始位置（最初の部屋の中心）"""
+        return self.rooms[0].center if self.rooms else None
+
+    def index(self):
+        """
+        到達可能性の索引 (連結成分・開始位置からの距離場・階段の位置) を計算する
+
+        tilemap を直接書き換えた場合はこのメソッドを呼び直すこと。
+        """
+        passable = self.tilemap == FLOOR
+        self.components, self.component_count = label_components(passable)
+        self._fields.clear()
+
+        self.floor_cells = np.argwhere(passable).astype(np.int32)
+        self.room_cells = []
+        for room in self.rooms:
+            x0, x1 = max(room.left, 0), min(room.right, self.width)
+            y0, y1 = max(room.top, 0), min(room.bottom, self.height)
+            cells = np.argwhere(passable[x0:x1, y0:y1]).astype(np.int32) if x0 < x1 and y0 < y1 \
+                else np.zeros((0, 2), dtype=np.int32)
+            self.room_cells.append(cells + np.array([x0, y0], dtype=np.int32))
+
+        start = self.start_pos()
+        if start is None:
+            self.start_distance = np.full((self.width, self.height), -1, dtype=np.int32)
+            self.stairs_pos = None
+            return
+        self.start_distance = bfs_distance(passable, [start])
+        self.stairs_pos = self.farthest_reachable()
+
+    def sample_floor_cells(self, k: int, rng: Optional[random.Random] = None, room: Optional[int] = None,
+                           exclude: Optional[Container[Tuple[int, int]]] = None) -> List[Tuple[int, int]]:
+        """
+        床のセルを重複なしで k 個選ぶ
+
+        index() で作ったセルの一覧から非復元抽出するので、候補が足りる限り必ず k 個返し、
+        計算量は選んだ数 (+ exclude に当たった数) に比例する。
+
+        Args:
+            k: 選ぶ数
+            rng: 乱数生成器（シードから同じ配置を再現する場合に渡す）
+            room: 部屋の番号 (self.rooms の添字)。省略時はフロア全体から選ぶ
+            exclude: 選ばないセル（開始位置・階段・配置済みのセルなど）
+        """
+        cells = self.floor_cells if room is None else self.room_cells[room]
+        picked: List[Tuple[int, int]] = []
+        if k <= 0:
+            return picked
+        for i in _sample_indices(len(cells), rng or random):
+            cell = (int(cells[i, 0]), int(cells[i, 1]))
+            if exclude is not None and cell in exclude:
+                continue
+            picked.append(cell)
+            if len(picked) == k:
+                break
+        return picked
+
+    def distance_field(self, source: Tuple[int, int]) -> np.ndarray:
+        """
+        source からの BFS 距離場 (到達できないセルは -1)
+
+        開始位置からの距離場は index() で計算済み。それ以外は初回だけ計算してキャッシュする。
+        返した配列は共有しているので書き換えないこと。
+        """
+        source = (int(source[0]), int(source[1]))
+        if source == self.start_pos():
+            return self.start_distance
+
+        return self._fields.get(source, lambda: bfs_distance(self.tilemap == FLOOR, [source]))
+
+    def farthest_reachable(self, source: Optional[Tuple[int, int]] = None) -> Optional[Tuple[int, int]]:
+        """source (省略時は開始位置) から歩いて行ける最も遠いタイル"""
+        field = self.start_distance if source is None else self.distance_field(source)
+        if field.max() < 0:
+            return None
+        x, y = np.unravel_index(int(np.argmax(field)), field.shape)
+        return int(x), int(y)
+
+    def distance(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        """a から b までの歩数 (つながっていない・床でない場合は -1)"""
+        if not self.is_connected(a, b):
+            return -1
+        # 開始位置を含む場合は計算済みの距離場で済ませる
+        if tuple(b) == self.start_pos():
+            a, b = b, a
+        return int(self.distance_field(a)[b[0], b[1]])
+
+    def is_connected(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """a と b が床でつながっているか"""
+        if not (self.is_floor(*a) and self.is_floor(*b)):
+            return False
+        return self.components[a[0], a[1]] == self.components[b[0], b[1]]
+
+    def chunk_grid_size(self) -> Tuple[int, int]:
+        """マップ全体のチャンク数 (横, 縦)"""
+        return ((self.width + self.chunk_size - 1) // self.chunk_size,
+                (self.height + self.chunk_size - 1) // self.chunk_size)
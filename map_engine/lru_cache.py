@@ -0,0 +1,59 @@
+# map_engine/lru_cache.py
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# 「キャッシュに無い」を表す値（None もキャッシュできるようにするため）
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    最大 max_entries 個の値を持つ LRU キャッシュ（超えたら最も長く使われていないものから破棄）
+
+    チャンク・フロア・距離場・スプライト・文字列の各キャッシュがこれを使う。
+    hits / misses / evictions を数えるので、上限の調整に使える。
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """key の値を返す（なければ builder() で作って追加する。None もキャッシュする）"""
+        value = self.lookup(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, builder())
+        return value
+
+    def lookup(self, key: Hashable, default: Any = None) -> Any:
+        """key の値を返す（なければ default。作りはしない）"""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        """key の値を設定して、その値を返す"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -3,11 +3,65 @@ import pygame
 import random
 import os
 from typing import List, Tuple
+
+import numpy as np
+
 from .tile_selector import TileSelector, DEFAULT_TILE_SIZE
+from .chunk_cache import ChunkCache
+from .floor_cache import FloorCache
+from .distance_field import FlowField
+from .floor_layout import FloorLayout, RENDER_FLOOR, RENDER_WALL_FACE
+
+def find_tileset_paths() -> List[str]:
+    """タイルセット画像のパスを探す (main.py からの相対パスを想定)"""
+    possible_paths = [
+        ["assets/tileset1.png", "assets/tileset2.png"],
+        ["Assets/tileset1.png", "Assets/tileset2.png"],
+        ["tileset1.png", "tileset2.png"],
+    ]
+    
+    for paths in possible_paths:
+        if os.path.exists(paths[0]): 
+            return [p for p in paths if os.path.exists(p)]
+    
+    # 実行ディレクトリが見つからない場合はエラー
+    raise FileNotFoundError(
+        "タイルセット画像が見つかりません。assets/tileset1.png を配置してください。"
+    )
+
+
+def render_cells(cells: np.ndarray, floor_tile, wall_tile, tile_size: int) -> pygame.Surface:
+    """
+    描画用に分類済みのセル (render_map の一部) を1枚の Surface に描画する
+    
+    分類済みのセルだけを描画する (床 → 床の上に立つ壁 の順)。
+    """
+    width, height = cells.shape
+    surface = pygame.Surface((width * tile_size, height * tile_size))
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    surface.fill((0, 0, 0))
+    
+    for kind, tile, fallback_color in (
+        (RENDER_FLOOR, floor_tile, (200, 200, 200)),
+        (RENDER_WALL_FACE, wall_tile, (80, 60, 40)),
+    ):
+        xs, ys = np.nonzero(cells == kind)
+        positions = [(int(x) * tile_size, int(y) * tile_size) for x, y in zip(xs, ys)]
+        if tile:
+            surface.blits([(tile, pos) for pos in positions], doreturn=False)
+        else:
+            # デフォルト矩形
+            for pos in positions:
+                pygame.draw.rect(surface, fallback_color, (*pos, tile_size, tile_size))
+    
+    return surface
+
 
 class MapGenerator:
     def __init__(self, width=50, height=50, tile_size=DEFAULT_TILE_SIZE, 
-                 floor_tileset=0, floor_tile=0, wall_tileset=0, wall_tile=1):
+                 floor_tileset=0, floor_tile=0, wall_tileset=0, wall_tile=1,
+                 chunk_size=16, max_chunks=16, max_cached_floors=8):
         self.width = width
         self.height = height
         self.tile_size = tile_size
@@ -15,30 +69,16 @@ class MapGenerator:
         self.room_min_size = 6
         self.room_max_size = 15
         
-        self.tilemap = [[0 for _ in range(height)] for _ in range(width)]
-        self.rooms: List[pygame.Rect] = []
-        
-        # タイルセレクター初期化のためのパス確認
-        possible_paths = [
-            ["assets/tileset1.png", "assets/tileset2.png"],
-            ["Assets/tileset1.png", "Assets/tileset2.png"],
-            ["tileset1.png", "tileset2.png"],
-        ]
+        # 静的なマップを chunk_size x chunk_size タイル単位で事前描画してキャッシュする
+        self.chunk_size = chunk_size
+        self.chunk_cache = ChunkCache(max_chunks)
         
-        tileset_paths = None
-        for paths in possible_paths:
-            # main.pyからの相対パスを想定してチェック
-            if os.path.exists(paths[0]): 
-                tileset_paths = [p for p in paths if os.path.exists(p)]
-                break
+        # 現在のフロア (tilemap・部屋・描画用の分類) と、生成済みフロアのキャッシュ
+        self.layout = FloorLayout(width, height, chunk_size)
+        self.floor_cache = FloorCache(max_cached_floors)
         
-        if not tileset_paths:
-            # 実行ディレクトリが見つからない場合はエラー
-            raise FileNotFoundError(
-                "タイルセット画像が見つかりません。assets/tileset1.png を配置してください。"
-            )
-        
-        self.tile_selector = TileSelector(tileset_paths, tile_size=tile_size) 
+        # タイルセレクター初期化
+        self.tile_selector = TileSelector(find_tileset_paths(), tile_size=tile_size) 
         
         self.floor_tileset = floor_tileset
         self.floor_tile = floor_tile
@@ -51,106 +91,179 @@ class MapGenerator:
         self.floor_tile = floor_tile
         self.wall_tileset = wall_tileset
         self.wall_tile = wall_tile
+        self.chunk_cache.clear()
+    
+    # --- 現在のフロアへのアクセス (従来の属性名で参照できるようにする) ---
+    
+    @property
+    def tilemap(self) -> np.ndarray:
+        """tilemap[x, y] (tilemap[x][y] でも参照可) : 0=壁, 1=床"""
+        return self.layout.tilemap
+    
+    @property
+    def rooms(self) -> List[pygame.Rect]:
+        return self.layout.rooms
+    
+    @property
+    def seed(self):
+        """直近の generate() に使ったシード"""
+        return self.layout.seed
+    
+    @property
+    def render_map(self) -> np.ndarray:
+        return self.layout.render_map
     
-    def generate(self):
-        """マップを生成"""
-        self.rooms.clear()
+    @property
+    def chunk_mask(self) -> np.ndarray:
+        return self.layout.chunk_mask
+    
+    @property
+    def stairs_pos(self):
+        """階段の位置（開始位置から歩いて行ける最も遠いタイル）"""
+        return self.layout.stairs_pos
+    
+    def generate(self, seed=None):
+        """
+        マップを生成
+        
+        Args:
+            seed: 乱数シード。同じシード・同じ設定なら同じマップになる（省略時はランダム）
+        """
+        self.apply_layout(self.build_layout(seed))
+    
+    def build_layout(self, seed=None) -> FloorLayout:
+        """
+        フロアを生成して返す（現在のフロアは変更しない）
+        
+        Surface を扱わないので別スレッドから呼んでもよい。
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
         
-        for x in range(self.width):
-            for y in range(self.height):
-                self.tilemap[x][y] = 0
+        key = self._floor_key(seed)
+        cached = self.floor_cache.get(key)
+        if cached is not None:
+            # キャッシュ済みのフロアを復元
+            tilemap, rooms = cached
+            layout = FloorLayout(self.width, self.height, self.chunk_size, seed,
+                                 tilemap=tilemap, rooms=[pygame.Rect(r) for r in rooms])
+            layout.classify()
+            layout.index()
+            return layout
+        
+        rng = random.Random(seed)
+        layout = FloorLayout(self.width, self.height, self.chunk_size, seed)
         
         for i in range(self.room_count):
-            w = random.randint(self.room_min_size, self.room_max_size)
-            h = random.randint(self.room_min_size, self.room_max_size)
-            x = random.randint(1, self.width - w - 1)
-            y = random.randint(1, self.height - h - 1)
+            w = rng.randint(self.room_min_size, self.room_max_size)
+            h = rng.randint(self.room_min_size, self.room_max_size)
+            x = rng.randint(1, self.width - w - 1)
+            y = rng.randint(1, self.height - h - 1)
             
             room = pygame.Rect(x, y, w, h)
-            self.rooms.append(room)
-            self.create_room(room)
+            layout.rooms.append(room)
+            layout.carve_room(room)
             
             if i > 0:
-                prev_center = self.rooms[i - 1].center
+                prev_center = layout.rooms[i - 1].center
                 new_center = room.center
-                self.create_corridor(prev_center, new_center)
+                layout.carve_corridor(prev_center, new_center)
+        
+        self.floor_cache.put(key, layout.tilemap, [tuple(r) for r in layout.rooms])
+        layout.classify()
+        layout.index()
+        return layout
+    
+    def apply_layout(self, layout: FloorLayout):
+        """生成済みのフロアに差し替える（描画キャッシュを破棄するだけなので一瞬で終わる）"""
+        self.layout = layout
+        self.chunk_cache.clear()
+    
+    def classify_tiles(self):
+        """
+        tilemap から描画用の分類を計算し直す
+        
+        tilemap を直接書き換えた場合はこのメソッドを呼び直すこと。
+        """
+        self.layout.classify()
+        self.layout.index()
+        self.chunk_cache.clear()
+    
+    def _floor_key(self, seed) -> tuple:
+        """フロアキャッシュのキー (シード + 生成結果を左右する設定)"""
+        return (seed, self.width, self.height,
+                self.room_count, self.room_min_size, self.room_max_size)
+    
+    def is_floor(self, x: int, y: int) -> bool:
+        """指定タイルが床かどうか (マップ範囲外は False)"""
+        return self.layout.is_floor(x, y)
+    
+    def start_pos(self) -> Tuple[int, int]:
+        """プレイヤーの開始位置（最初の部屋の中心）"""
+        return self.layout.start_pos()
+    
+    # --- 到達可能性の索引 (generate() のたびに FloorLayout.index() で計算済み) ---
+    
+    def distance_field(self, source: Tuple[int, int]) -> np.ndarray:
+        """source からの BFS 距離場 (到達できないセルは -1)"""
+        return self.layout.distance_field(source)
+    
+    def sample_floor_cells(self, k: int, rng=None, room=None, exclude=None) -> List[Tuple[int, int]]:
+        """床のセルを重複なしで k 個選ぶ (FloorLayout.sample_floor_cells)"""
+        return self.layout.sample_floor_cells(k, rng, room, exclude)
+    
+    def flow_field(self, target: Tuple[int, int]) -> FlowField:
+        """target へ向かうための距離場 (敵の追跡用。プレイヤーが動いたら作り直す)"""
+        return FlowField(self.layout.distance_field(target), (int(target[0]), int(target[1])))
+    
+    def farthest_reachable(self, source=None):
+        """source (省略時は開始位置) から歩いて行ける最も遠いタイル"""
+        return self.layout.farthest_reachable(source)
+    
+    def distance(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        """a から b までの歩数 (つながっていない場合は -1)"""
+        return self.layout.distance(a, b)
+    
+    def is_connected(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """a と b が床でつながっているか"""
+        return self.layout.is_connected(a, b)
     
     def create_room(self, room: pygame.Rect):
         """部屋の床を作成"""
-        for x in range(room.left, room.right):
-            for y in range(room.top, room.bottom):
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    self.tilemap[x][y] = 1
+        self.layout.carve_room(room)
     
     def create_corridor(self, start: Tuple[int, int], end: Tuple[int, int]):
         """L字型の通路を作成"""
-        x1, y1 = start
-        x2, y2 = end
-        
-        step_x = 1 if x1 < x2 else -1
-        x = x1
-        while x != x2:
-            if 0 <= x < self.width and 0 <= y1 < self.height:
-                self.tilemap[x][y1] = 1
-            x += step_x
-        
-        step_y = 1 if y1 < y2 else -1
-        y = y1
-        while y != y2:
-            if 0 <= x2 < self.width and 0 <= y < self.height:
-                self.tilemap[x2][y] = 1
-            y += step_y
+        self.layout.carve_corridor(start, end)
     
     def draw(self, surface: pygame.Surface, camera_x=0, camera_y=0):
-        """マップを描画 (カメラオフセット対応) - 垂直通路が壁に隠れるバグを修正"""
+        """マップを描画 (カメラオフセット対応) - 事前描画したチャンクを貼るだけ"""
         screen_w, screen_h = surface.get_size()
+        chunk_px = self.chunk_size * self.tile_size
         
-        # 描画範囲を計算
-        start_x = max(0, camera_x // self.tile_size)
-        end_x = min(self.width, (camera_x + screen_w) // self.tile_size + 1)
-        start_y = max(0, camera_y // self.tile_size)
-        end_y = min(self.height, (camera_y + screen_h) // self.tile_size + 1)
+        # 描画範囲 (チャンク単位) を計算
+        chunks_x, chunks_y = self.layout.chunk_grid_size()
+        start_cx = max(0, camera_x // chunk_px)
+        end_cx = min(chunks_x, (camera_x + screen_w) // chunk_px + 1)
+        start_cy = max(0, camera_y // chunk_px)
+        end_cy = min(chunks_y, (camera_y + screen_h) // chunk_px + 1)
+        
+        for cx in range(start_cx, end_cx):
+            for cy in range(start_cy, end_cy):
+                # 描画するセルが1つもないチャンクは飛ばす
+                if not self.chunk_mask[cx, cy]:
+                    continue
+                chunk = self.chunk_cache.get((cx, cy), lambda: self._render_chunk(cx, cy))
+                if chunk:
+                    surface.blit(chunk, (cx * chunk_px - camera_x, cy * chunk_px - camera_y))
+    
+    def _render_chunk(self, cx: int, cy: int) -> pygame.Surface:
+        """チャンク (cx, cy) の床と壁を1枚の Surface に描画する"""
+        start_x = cx * self.chunk_size
+        end_x = min(self.width, start_x + self.chunk_size)
+        start_y = cy * self.chunk_size
+        end_y = min(self.height, start_y + self.chunk_size)
         
         floor_tile = self.tile_selector.get_tile(self.floor_tileset, self.floor_tile)
         wall_tile = self.tile_selector.get_tile(self.wall_tileset, self.wall_tile)
-        
-        # まず床を描画
-        for x in range(start_x, end_x):
-            for y in range(start_y, end_y):
-                if self.tilemap[x][y] == 1:
-                    screen_x = x * self.tile_size - camera_x
-                    screen_y = y * self.tile_size - camera_y
-                    
-                    # 床の描画
-                    if floor_tile:
-                        surface.blit(floor_tile, (screen_x, screen_y))
-                    else:
-                        pygame.draw.rect(surface, (200, 200, 200), 
-                                         (screen_x, screen_y, self.tile_size, self.tile_size))
-        
-        # 次に壁を描画 (床の上に立つ壁のみ)
-        # 床の上(y-1)の壁(0)は、Isometricな表現でない限り、
-        # 床(1)の上に描画されるべきです。
-        for x in range(start_x, end_x):
-            for y in range(start_y, end_y):
-                
-                # セル(x, y) が壁(0)で、その下(y+1)が床(1)の場合、
-                # セル(x, y) を床の上に立つ壁として描画します。
-                # y-1 (奥側) の床の有無はここでは無視します。
-                
-                # **重要**: y座標のループの順序は、壁が手前の床に描画されるため、
-                # この単純な描画では問題になりません。
-                
-                if self.tilemap[x][y] == 0:
-                    # その下のセルが床であるかどうかをチェック
-                    if y < self.height - 1 and self.tilemap[x][y+1] == 1:
-                        screen_x = x * self.tile_size - camera_x
-                        screen_y = y * self.tile_size - camera_y
-
-                        # 壁の描画
-                        if wall_tile:
-                            surface.blit(wall_tile, (screen_x, screen_y))
-                        else:
-                            # デフォルト矩形
-                            pygame.draw.rect(surface, (80, 60, 40), 
-                                             (screen_x, screen_y, self.tile_size, self.tile_size))
\ No newline at end of file
+        return render_cells(self.render_map[start_x:end_x, start_y:end_y], floor_tile, wall_tile, self.tile_size)
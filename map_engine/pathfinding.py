@@ -0,0 +1,264 @@
+# map_engine/pathfinding.py
+import heapq
+from collections import deque
+from itertools import count
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+Tile = Tuple[int, int]
+
+# 上下左右
+_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def astar(passable: Callable[[int, int], bool], start: Tile, goal: Tile,
+          blocked=None, max_expansions: Optional[int] = None) -> Tuple[Optional[List[Tile]], int, bool]:
+    """
+    4方向の A* 探索
+
+    Args:
+        passable: passable(x, y) が True のタイルだけを通る (map_gen.is_floor など)
+        start: 開始タイル
+        goal: 目標タイル（blocked に含まれていても目標としては扱う）
+        blocked: 通れないタイルの集合 (`tile in blocked` が使えるもの)
+        max_expansions: 展開するノード数の上限
+
+    Returns:
+        (path, expansions, complete)
+        path は start を含まず goal を含むタイルの列（見つからなければ None）。
+        complete が False のときは上限で打ち切っただけで、到達できないとは限らない。
+    """
+    if start == goal:
+        return [], 0, True
+    gx, gy = goal
+
+    tie = count()
+    open_heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, next(tie), start)]
+    g_score: Dict[Tile, int] = {start: 0}
+    came_from: Dict[Tile, Tile] = {}
+    closed = set()
+    expansions = 0
+
+    while open_heap:
+        _, neg_g, _, node = heapq.heappop(open_heap)
+        if node in closed:
+            continue
+        if node == goal:
+            path = [node]
+            while path[-1] in came_from and came_from[path[-1]] != start:
+                path.append(came_from[path[-1]])
+            path.reverse()
+            return path, expansions, True
+        if max_expansions is not None and expansions >= max_expansions:
+            return None, expansions, False
+        closed.add(node)
+        expansions += 1
+
+        g = -neg_g + 1
+        x, y = node
+        for dx, dy in _DIRECTIONS:
+            nxt = (x + dx, y + dy)
+            if nxt in closed or not passable(*nxt):
+                continue
+            if blocked is not None and nxt != goal and nxt in blocked:
+                continue
+            if g < g_score.get(nxt, g + 1):
+                g_score[nxt] = g
+                came_from[nxt] = node
+                h = abs(nxt[0] - gx) + abs(nxt[1] - gy)
+                # f が同じなら g の大きい (目標に近い) ノードを先に展開する
+                heapq.heappush(open_heap, (g + h, -g, next(tie), nxt))
+
+    return None, expansions, True
+
+
+class _CachedPath:
+    """1体分のキャッシュ済み経路"""
+
+    __slots__ = ("pos", "goal", "steps", "drift")
+
+    def __init__(self, pos: Tile, goal: Tile, steps: List[Tile]):
+        self.pos = pos                      # 経路を最後に確認したときの位置
+        self.goal = goal
+        self.steps: Deque[Tile] = deque(steps)  # これから進むタイル (goal を含む)
+        self.drift = 0                      # 目標の移動に合わせて継ぎ足した回数
+
+
+class PathPlanner:
+    """
+    個別の目標 (巡回地点・逃走先・プレイヤー以外の対象) に向かう敵のための経路キャッシュ
+
+    - 経路は敵ごと (key ごと) に保持し、毎ターン探索し直さない
+    - 目標が1マス動いたときは経路の末尾を継ぎ足す／切り詰めるだけで済ませる
+    - 次のタイルが他のキャラクターにふさがれたときは、少し先の経路上のタイルまでの迂回路だけを探して差し込む
+      （遠い合流先から順に試し、どれもだめなら経路を捨ててふさがれたタイルを避けて探索し直す）
+    - 1ターンに展開できるノード数 (budget_per_turn) を超える探索は次のターンに回す
+    - 到達できないと分かった (位置, 目標) は unreachable_retry ターンの間は探索し直さない
+      （ふさいでいたキャラクターが動けば通れるようになるので、しばらくしたら試し直す）
+
+    ターンの最初に begin_turn() を呼ぶこと。
+    """
+
+    def __init__(self, map_gen, budget_per_turn: int = 4000, detour_length: int = 8,
+                 detour_expansions: int = 200, max_drift: int = 8, unreachable_retry: int = 8):
+        self.map_gen = map_gen
+        self.budget_per_turn = budget_per_turn
+        self.detour_length = detour_length
+        self.detour_expansions = detour_expansions
+        self.max_drift = max_drift
+        self.unreachable_retry = unreachable_retry
+
+        self.budget = budget_per_turn
+        self.turn = 0
+        self._paths: Dict[Hashable, _CachedPath] = {}
+        # 到達できないと分かった (開始位置, 目標, ターン)。同じ探索を毎ターン繰り返さない
+        self._unreachable: Dict[Hashable, Tuple[Tile, Tile, int]] = {}
+
+        # 統計（デバッグ・計測用）
+        self.full_searches = 0
+        self.repairs = 0
+        self.deferred = 0
+
+    def begin_turn(self):
+        """ターンの探索予算を元に戻す"""
+        self.budget = self.budget_per_turn
+        self.turn += 1
+
+    def forget(self, key: Hashable):
+        """key の経路を捨てる（敵が倒されたときなど）"""
+        self._paths.pop(key, None)
+        self._unreachable.pop(key, None)
+
+    def clear(self):
+        """全ての経路を捨てる（フロアが変わったとき）"""
+        self._paths.clear()
+        self._unreachable.clear()
+
+    def path_of(self, key: Hashable) -> List[Tile]:
+        """key のキャッシュ済み経路（これから進むタイルの列）"""
+        entry = self._paths.get(key)
+        return list(entry.steps) if entry else []
+
+    def next_step(self, key: Hashable, pos: Tile, goal: Tile, blocked=None) -> Optional[Tile]:
+        """
+        pos にいる key が goal に向かうために次に進むタイル
+
+        進めない（到達できない・ふさがれている・今ターンの予算切れ）ときは None を返す。
+        返したタイルに実際に移動したかどうかは、次の呼び出しで pos を見て判断する。
+        """
+        pos = (int(pos[0]), int(pos[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        if pos == goal:
+            return None
+
+        entry = self._sync(key, pos, goal)
+        if entry is None:
+            entry = self._plan(key, pos, goal, blocked)
+            if entry is None:
+                return None
+
+        step = entry.steps[0]
+        if blocked is not None and step in blocked:
+            if step == goal:
+                # 目標そのものがふさがっている（隣まで来ている）
+                return None
+            if not self._repair(entry, pos, blocked):
+                if self.budget <= 0:
+                    # 今ターンの予算切れ。経路は残して次のターンに試し直す
+                    self.deferred += 1
+                    return None
+                # 近くで合流できない: 経路を捨て、ふさがれたタイルを避けて探し直す
+                del self._paths[key]
+                entry = self._plan(key, pos, goal, blocked)
+                if entry is None:
+                    return None
+            step = entry.steps[0]
+            if step in blocked:
+                return None
+        return step
+
+    def _plan(self, key: Hashable, pos: Tile, goal: Tile, blocked) -> Optional[_CachedPath]:
+        """pos から goal までの経路を今ターンの予算で探してキャッシュする。見つからなければ None"""
+        unreachable = self._unreachable.get(key)
+        if (unreachable is not None and unreachable[:2] == (pos, goal)
+                and self.turn - unreachable[2] < self.unreachable_retry):
+            return None
+        path, complete = self._search(pos, goal, blocked, self.budget)
+        if path is None:
+            if complete:
+                self._unreachable[key] = (pos, goal, self.turn)
+            return None
+        self.full_searches += 1
+        entry = _CachedPath(pos, goal, path)
+        self._paths[key] = entry
+        self._unreachable.pop(key, None)
+        return entry
+
+    def _sync(self, key: Hashable, pos: Tile, goal: Tile) -> Optional[_CachedPath]:
+        """キャッシュ済みの経路を現在の位置・目標に合わせる。使えなければ捨てて None を返す"""
+        entry = self._paths.get(key)
+        if entry is None:
+            return None
+
+        # 前回からの移動分だけ経路を進める
+        if pos != entry.pos:
+            if pos not in entry.steps:
+                del self._paths[key]
+                return None
+            while entry.steps.popleft() != pos:
+                pass
+            entry.pos = pos
+
+        # 目標が隣のタイルに動いただけなら経路を継ぎ足す (または目標の手前で切り詰める)
+        if goal != entry.goal:
+            moved_by_one = abs(goal[0] - entry.goal[0]) + abs(goal[1] - entry.goal[1]) == 1
+            if not moved_by_one or entry.drift >= self.max_drift or not self.map_gen.is_floor(*goal):
+                del self._paths[key]
+                return None
+            if goal in entry.steps:
+                while entry.steps[-1] != goal:
+                    entry.steps.pop()
+            else:
+                entry.steps.append(goal)
+            entry.goal = goal
+            entry.drift += 1
+
+        if not entry.steps:
+            del self._paths[key]
+            return None
+        return entry
+
+    def _repair(self, entry: _CachedPath, pos: Tile, blocked) -> bool:
+        """
+        ふさがれたタイルを避けて、少し先の経路上のタイルに戻る迂回路を差し込む
+
+        合流先は detour_length 歩先から手前に向かって、ふさがれていないタイルを順に試す。
+        どこにも合流できなければ False（経路はそのまま）。
+        """
+        steps = entry.steps
+        for i in range(min(self.detour_length, len(steps)) - 1, 0, -1):
+            rejoin = steps[i]
+            if rejoin in blocked:
+                continue
+            if self.budget <= 0:
+                return False
+            detour, _ = self._search(pos, rejoin, blocked, self.detour_expansions)
+            if detour is None:
+                continue
+            for _ in range(i + 1):
+                steps.popleft()
+            steps.extendleft(reversed(detour))
+            self.repairs += 1
+            return True
+        return False
+
+    def _search(self, start: Tile, goal: Tile, blocked, limit: int) -> Tuple[Optional[List[Tile]], bool]:
+        """今ターンの予算の範囲で A* を実行する。(経路, 打ち切らずに終わったか) を返す"""
+        limit = min(limit, self.budget)
+        if limit <= 0:
+            self.deferred += 1
+            return None, False
+        path, expansions, complete = astar(self.map_gen.is_floor, start, goal, blocked, limit)
+        self.budget -= expansions
+        if path is None and not complete:
+            self.deferred += 1
+        return path, complete
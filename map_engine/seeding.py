@@ -0,0 +1,24 @@
+# map_engine/seeding.py
+import hashlib
+import random
+
+
+def derive_seed(*parts) -> int:
+    """
+    親シードと識別子から決定的に子シード (64bit) を作る
+
+    例: derive_seed(run_seed, "floor", 3) / derive_seed(floor_seed, "traps")
+    組み込みの hash() は実行ごとに値が変わるため使わない。
+    """
+    key = "/".join(repr(p) for p in parts).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "little")
+
+
+def floor_seed(run_seed: int, floor: int) -> int:
+    """ランのシードから階層ごとのシードを作る"""
+    return derive_seed(run_seed, "floor", floor)
+
+
+def new_run_seed() -> int:
+    """新しいランのシードを作る（表示・再現用に 32bit に収める）"""
+    return random.SystemRandom().randrange(2 ** 32)
@@ -1,19 +1,36 @@
 # map_engine/tile_selector.py
 import pygame
 import os
-from typing import List
+import struct
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 DEFAULT_TILE_SIZE = 48
 
+# デコード済みタイルセットの保存先 (PNG を毎回デコードしないためのキャッシュ)
+TILE_CACHE_DIR = ".tile_cache"
+_CACHE_MAGIC = b"TSC1"
+
+
 class TileSelector:
-    def __init__(self, tileset_images: List[str], tile_size=DEFAULT_TILE_SIZE): 
+    def __init__(self, tileset_images: List[str], tile_size=DEFAULT_TILE_SIZE, cache_dir: Optional[str] = TILE_CACHE_DIR):
         """
-        タイルセット画像からタイルを読み込み、1次元リストに格納する。
+        タイルセット画像を読み込む。
+
+        タイルは get_tile() で初めて要求されたときにタイルセット画像の subsurface として切り出す。
+        cache_dir を指定すると、デコード済みの画像を生の RGBA 形式で保存して次回の起動を速くする。
         """
         self.tile_size = tile_size
-        self.tileset_images = []  
-        self.tileset_names = []   
-        
+        self.cache_dir = cache_dir
+        self.tilesets: List[pygame.Surface] = []
+        self.tileset_names = []
+        # 各タイルセットの (横のタイル数, 縦のタイル数)
+        self._grid_sizes: List[Tuple[int, int]] = []
+        # 切り出し済みのタイル ((タイルセット, インデックス) -> Surface)
+        self._tiles: Dict[Tuple[int, int], pygame.Surface] = {}
+
         for img_idx, img_path in enumerate(tileset_images):
             try:
                 # パスが存在しない場合に備えて、ロード時にエラーをチェック
@@ -21,36 +38,97 @@ class TileSelector:
                      print(f"警告: ファイルが見つかりません - {img_path}")
                      continue
 
-                tileset = pygame.image.load(img_path).convert_alpha()
-                img_width = tileset.get_width()
-                img_height = tileset.get_height()
-                
-                width = img_width // tile_size
-                height = img_height // tile_size
-                
-                tiles = []
-                for y in range(height):
-                    for x in range(width):
-                        tile_surface = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
-                        tile_surface.blit(tileset, (0, 0), 
-                                         (x * tile_size, y * tile_size, tile_size, tile_size))
-                        tiles.append(tile_surface)
-                        
-                self.tileset_images.append(tiles)
+                tileset = self._load_tileset(img_path)
+                width = tileset.get_width() // tile_size
+                height = tileset.get_height() // tile_size
+
+                self.tilesets.append(tileset)
+                self._grid_sizes.append((width, height))
                 self.tileset_names.append(os.path.basename(img_path))
-                print(f"タイルセット読み込み成功 (TS Index {img_idx}): {img_path} ({len(tiles)} tiles)")
+                print(f"タイルセット読み込み成功 (TS Index {img_idx}): {img_path} ({width * height} tiles)")
             except pygame.error as e:
                 # Pygameによる画像ロードエラーが発生した場合
                 raise RuntimeError(f"タイルセット {img_path} のロード中にエラーが発生しました: {e}")
-    
+
+    def _load_tileset(self, img_path: str) -> pygame.Surface:
+        """タイルセット画像を読み込む（デコード済みキャッシュがあればそちらを使う）"""
+        cache_path = self._cache_path(img_path)
+        image = self._read_cache(cache_path) if cache_path else None
+        if image is None:
+            image = pygame.image.load(img_path)
+            if cache_path:
+                self._write_cache(cache_path, image)
+
+        if pygame.display.get_surface() is not None:
+            return image.convert_alpha()
+        return image
+
+    def _cache_path(self, img_path: str) -> Optional[str]:
+        """キャッシュファイルのパス（元画像のパス・更新日時・サイズが変われば別のファイルになる）"""
+        if not self.cache_dir:
+            return None
+        stat = os.stat(img_path)
+        key = f"{os.path.abspath(img_path)}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8")
+        digest = hashlib.sha1(key).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(img_path)}.{digest}.rgba")
+
+    def _read_cache(self, cache_path: str) -> Optional[pygame.Surface]:
+        """生の RGBA 形式で保存したタイルセットを読み込む"""
+        try:
+            with open(cache_path, "rb") as f:
+                header = f.read(len(_CACHE_MAGIC) + 8)
+                if header[:len(_CACHE_MAGIC)] != _CACHE_MAGIC:
+                    return None
+                width, height = struct.unpack("<II", header[len(_CACHE_MAGIC):])
+                data = f.read()
+            if len(data) != width * height * 4:
+                return None
+            return pygame.image.frombuffer(data, (width, height), "RGBA")
+        except (OSError, struct.error, ValueError):
+            return None
+
+    def _write_cache(self, cache_path: str, image: pygame.Surface):
+        """タイルセットを生の RGBA 形式で保存する（保存できなくてもゲームは続ける）"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_CACHE_MAGIC)
+                f.write(struct.pack("<II", image.get_width(), image.get_height()))
+                f.write(pygame.image.tobytes(image, "RGBA"))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"警告: タイルセットのキャッシュを保存できません - {e}")
+
     def get_tile(self, tileset_idx: int, tile_idx: int):
         """指定されたタイルセット（ファイル）とインデックスのタイルを取得"""
-        if 0 <= tileset_idx < len(self.tileset_images):
-            tiles = self.tileset_images[tileset_idx]
-            if 0 <= tile_idx < len(tiles):
-                return tiles[tile_idx]
-        return None
-    
+        if not 0 <= tileset_idx < len(self.tilesets):
+            return None
+        width, height = self._grid_sizes[tileset_idx]
+        if not 0 <= tile_idx < width * height:
+            return None
+
+        key = (tileset_idx, tile_idx)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = self._slice_tile(tileset_idx, tile_idx % width, tile_idx // width)
+            self._tiles[key] = tile
+        return tile
+
+    def _slice_tile(self, tileset_idx: int, x: int, y: int) -> pygame.Surface:
+        """
+        タイルを切り出す
+
+        半透明のピクセルを含むタイルはタイルセット画像の subsurface（コピーなし）をそのまま使い、
+        完全に不透明なタイルは convert() してアルファなしで高速に描画できるようにする。
+        """
+        ts = self.tile_size
+        tile = self.tilesets[tileset_idx].subsurface((x * ts, y * ts, ts, ts))
+        opaque = bool(np.all(pygame.surfarray.array_alpha(tile) == 255))
+        if opaque and pygame.display.get_surface() is not None:
+            return tile.convert()
+        return tile
+
     def get_tileset_count(self):
         """読み込んだタイルセット（ファイル）の数を取得"""
-        return len(self.tileset_images)
\ No newline at end of file
+        return len(self.tilesets)
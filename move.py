@@ -75,12 +75,12 @@ class Player:
             return False
         
         # 壁チェック（0=壁, 1=床）
-        if map_gen.tilemap[x][y] == 0:
+        if not map_gen.is_floor(x, y):
             return False
         
         return True
     
-    def move(self, dx: int, dy: int, map_gen: 'MapGenerator'):
+    def move(self, dx: int, dy: int, map_gen: 'MapGenerator', occupancy=None):
         """
         プレイヤーを移動
         
@@ -88,6 +88,7 @@ class Player:
             dx: X方向の移動量（タイル単位）
             dy: Y方向の移動量（タイル単位）
             map_gen: マップジェネレーター
+            occupancy: 占有グリッド（渡すと移動後の位置を登録する）
         """
         new_x = self.tile_x + dx
         new_y = self.tile_y + dy
@@ -96,6 +97,9 @@ class Player:
         if self.can_move_to(new_x, new_y, map_gen):
             self.tile_x = new_x
             self.tile_y = new_y
+            # 戦闘はまだないので敵のいるマスにも入れる（占有グリッドには重なって登録される）
+            if occupancy is not None:
+                occupancy.move(self, (new_x, new_y))
             
             # 向きの更新
             if dx > 0:
@@ -107,13 +111,14 @@ class Player:
                 if self.image_left:
                     self.current_image = self.image_left
     
-    def handle_input(self, keys, map_gen: 'MapGenerator'):
+    def handle_input(self, keys, map_gen: 'MapGenerator', occupancy=None):
         """
         キー入力を処理
         
         Args:
             keys: pygame.key.get_pressed()の結果
             map_gen: マップジェネレーター
+            occupancy: 占有グリッド（渡すと移動後の位置を登録する）
         """
         global moved
         moved2 = False
@@ -121,29 +126,29 @@ class Player:
             moved = False  # 移動キーを押していない場合
         if keys[pygame.K_LSHIFT]:  # Shiftキーを押している場合は速度を上げる[_shift]
             if keys[pygame.K_w] and not moved2:
-                self.move(0, -1, map_gen)
+                self.move(0, -1, map_gen, occupancy)
                 moved2 = True
             if keys[pygame.K_s] and not moved2:
-                self.move(0, 1, map_gen)
+                self.move(0, 1, map_gen, occupancy)
                 moved2 = True
             if keys[pygame.K_a] and not moved2:
-                self.move(-1, 0, map_gen)
+                self.move(-1, 0, map_gen, occupancy)
                 moved2 = True
             if keys[pygame.K_d] and not moved2:
-                self.move(1, 0, map_gen)
+                self.move(1, 0, map_gen, occupancy)
                 moved2 = True
         if keys[pygame.K_LSHIFT] == False:  # Shiftキーを押していない時
             if keys[pygame.K_w] and not moved:
-                self.move(0, -1, map_gen)
+                self.move(0, -1, map_gen, occupancy)
                 moved = True
             if keys[pygame.K_s] and not moved:
-                self.move(0, 1, map_gen)
+                self.move(0, 1, map_gen, occupancy)
                 moved = True
             if keys[pygame.K_a] and not moved:
-                self.move(-1, 0, map_gen)
+                self.move(-1, 0, map_gen, occupancy)
                 moved = True
             if keys[pygame.K_d] and not moved:
-                self.move(1, 0, map_gen)
+                self.move(1, 0, map_gen, occupancy)
                 moved = True
     def get_camera_pos(self, screen_width: int, screen_height: int, map_width: int, map_height: int):
         """
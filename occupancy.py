@@ -0,0 +1,71 @@
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+Tile = Tuple[int, int]
+
+
+class OccupancyGrid:
+    """
+    タイル -> そのタイルにいるキャラクター の索引
+
+    毎ターン全員の位置から作り直すのではなく、キャラクターが出現・移動・消滅したときだけ更新する。
+    `tile in grid` で「誰かがいるか」を O(1) で調べられるので、
+    enemy.greedy_step() や PathPlanner.next_step() の occupied / blocked 引数にそのまま渡せる。
+
+    記録するのはキャラクターがいるタイルだけなので、巨大ワールドでもマップの大きさに関係なく使える。
+    同じタイルに複数のキャラクターが重なってもよい（プレイヤーが敵のいるマスに入った場合など）。
+    """
+
+    def __init__(self):
+        self._cells: Dict[Tile, List[Hashable]] = {}
+        self._positions: Dict[Hashable, Tile] = {}
+
+    def add(self, entity: Hashable, tile: Tile):
+        """キャラクターを tile に登録する（登録済みなら移動として扱う）"""
+        if entity in self._positions:
+            self.move(entity, tile)
+            return
+        tile = (int(tile[0]), int(tile[1]))
+        self._positions[entity] = tile
+        self._cells.setdefault(tile, []).append(entity)
+
+    def remove(self, entity: Hashable):
+        """キャラクターの登録を消す（倒されたときなど）"""
+        tile = self._positions.pop(entity, None)
+        if tile is not None:
+            self._unlink(entity, tile)
+
+    def move(self, entity: Hashable, tile: Tile):
+        """キャラクターの位置を更新する"""
+        tile = (int(tile[0]), int(tile[1]))
+        old = self._positions.get(entity)
+        if old == tile:
+            return
+        if old is not None:
+            self._unlink(entity, old)
+        self._positions[entity] = tile
+        self._cells.setdefault(tile, []).append(entity)
+
+    def _unlink(self, entity: Hashable, tile: Tile):
+        occupants = self._cells[tile]
+        occupants.remove(entity)
+        if not occupants:
+            del self._cells[tile]
+
+    def at(self, tile: Tile) -> Optional[Hashable]:
+        """tile にいるキャラクター（いなければ None）"""
+        occupants = self._cells.get((int(tile[0]), int(tile[1])))
+        return occupants[0] if occupants else None
+
+    def clear(self):
+        """全ての登録を消す（フロアを移動したとき）"""
+        self._cells.clear()
+        self._positions.clear()
+
+    def __contains__(self, tile) -> bool:
+        return tile in self._cells
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[Tile]:
+        return iter(self._cells)
@@ -0,0 +1,193 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from arrays import grow_arrays
+from sprite_cache import SpriteCache, shared_cache
+
+
+class ParticleSystem:
+    """
+    パーティクルをまとめて扱うクラス
+
+    位置・速度・重力・寿命・大きさ・色を numpy 配列で持ち、
+    - update() : 全パーティクルを1回のベクトル演算で dt だけ動かし、寿命の尽きたものをまとめて詰める
+                 （速度・寿命は 60fps の1フレームを dt=1.0 とした単位）
+    - draw()   : (色, 大きさ, アルファ) ごとに事前描画した円 (SpriteCache) を Surface.blits でまとめて貼る
+    ので、パーティクルごとに Surface を作ったりリストから remove したりしない。
+
+    max_particles を指定すると配列をその大きさで固定し、生きているパーティクルの数を上限までに抑える。
+    上限を超える emit() は overflow で決めた方法で捌く:
+    - "shortest" : 残り寿命の短いものから消して新しいパーティクルの場所を空ける
+    - "newest"   : 入りきらない分の新しいパーティクルを出さない
+    - "scale"    : 空きに合わせて放出数を減らし、足りない分は "shortest" と同じく残り寿命の短いものを消す
+                   （放出数は少なくとも半分にとどめ、エフェクトが消えてしまわないようにする）
+    """
+
+    OVERFLOW_POLICIES = ("shortest", "newest", "scale")
+
+    def __init__(self, capacity: int = 1024, seed=None, sprites: Optional[SpriteCache] = None,
+                 max_particles: Optional[int] = None, overflow: str = "shortest"):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"未知の overflow です: {overflow!r} {self.OVERFLOW_POLICIES}")
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.ticks = 0  # update() を呼んだ回数（画面の更新判定用）
+        self.max_particles = max(1, max_particles) if max_particles is not None else None
+        self.overflow = overflow
+        self.dropped = 0  # 上限のために消した・出さなかったパーティクルの数
+
+        capacity = max(1, self.max_particles or capacity)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+        # 事前描画した円 (色, 大きさ, アルファの段階ごと)
+        self.sprites = sprites or shared_cache()
+
+    _FIELDS = ("x", "y", "vx", "vy", "gravity", "life", "max_life", "size", "color")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def emit(self, x: float, y: float, count: int, colors: Sequence[Tuple[int, int, int]],
+             vx_range: Tuple[float, float], vy_range: Tuple[float, float], gravity: float,
+             size_range: Tuple[int, int] = (3, 8), life_range: Tuple[int, int] = (30, 60)):
+        """
+        (x, y) から count 個のパーティクルを放出する
+
+        速度・大きさ・寿命はそれぞれの範囲から一様に選び、色は colors から1つずつ選ぶ。
+        （大きさ・寿命の範囲は両端を含む）
+        """
+        count = self._fit_budget(count)
+        if count <= 0:
+            return
+        grow_arrays(self, self._FIELDS, self.count + count)
+        s = slice(self.count, self.count + count)
+        rng = self.rng
+
+        self.x[s] = x
+        self.y[s] = y
+        self.vx[s] = rng.uniform(vx_range[0], vx_range[1], count)
+        self.vy[s] = rng.uniform(vy_range[0], vy_range[1], count)
+        self.gravity[s] = gravity
+        self.size[s] = rng.integers(size_range[0], size_range[1] + 1, count)
+        life = rng.integers(life_range[0], life_range[1] + 1, count)
+        self.life[s] = life
+        self.max_life[s] = life
+        palette = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        self.color[s] = palette[rng.integers(0, len(palette), count)]
+        self.count += count
+
+    def _fit_budget(self, count: int) -> int:
+        """max_particles に収まるように放出数を決め、必要なら残り寿命の短いパーティクルを消す"""
+        limit = self.max_particles
+        if limit is None or self.count + count <= limit:
+            return count
+
+        requested = count
+        count = min(count, limit)
+        free = limit - self.count
+        if self.overflow == "newest":
+            count = max(0, free)
+        elif self.overflow == "scale":
+            count = max(free, (count + 1) // 2)
+        # 足りない分は残り寿命の短いものから消す
+        self._drop_shortest(self.count + count - limit)
+        self.dropped += requested - count
+        return count
+
+    def _drop_shortest(self, k: int):
+        """残り寿命の短いパーティクルを k 個消す"""
+        n = self.count
+        if k <= 0 or n == 0:
+            return
+        if k >= n:
+            self.dropped += n
+            self.count = 0
+            return
+        keep = np.ones(n, dtype=bool)
+        keep[np.argpartition(self.life[:n], k - 1)[:k]] = False
+        self._compact(keep)
+        self.dropped += k
+
+    def _compact(self, keep: np.ndarray):
+        """keep が True のパーティクルだけを前に詰める"""
+        n = self.count
+        k = int(np.count_nonzero(keep))
+        for name in self._FIELDS:
+            arr = getattr(self, name)
+            arr[:k] = arr[:n][keep]
+        self.count = k
+
+    def update(self, dt: float = 1.0):
+        """全パーティクルを dt だけ進め、寿命の尽きたものを取り除く"""
+        self.ticks += 1
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.vy[:n] += self.gravity[:n] * dt
+        self.life[:n] -= dt
+        self.vx[:n] *= 0.98 ** dt  # 空気抵抗
+
+        alive = self.life[:n] > 0
+        if not alive.all():
+            # 生きているものを前に詰める
+            self._compact(alive)
+
+    def clear(self):
+        """全てのパーティクルを消す"""
+        self.count = 0
+
+    def _positions(self, ahead: float):
+        """ahead だけ先に進めた描画位置（最後の update() からの補間）"""
+        n = self.count
+        if ahead:
+            return self.x[:n] + self.vx[:n] * ahead, self.y[:n] + self.vy[:n] * ahead
+        return self.x[:n], self.y[:n]
+
+    def get_rect(self, ahead: float = 0.0) -> Optional[pygame.Rect]:
+        """全パーティクルを囲む矩形（ワールド座標）。パーティクルがなければ None"""
+        n = self.count
+        if n == 0:
+            return None
+        size = self.size[:n]
+        x, y = self._positions(ahead)
+        left = int(np.floor((x - size).min())) - 1
+        top = int(np.floor((y - size).min())) - 1
+        right = int(np.ceil((x + size).max())) + 2
+        bottom = int(np.ceil((y + size).max())) + 2
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def draw(self, surface: pygame.Surface, camera_x: int = 0, camera_y: int = 0, ahead: float = 0.0):
+        """
+        画面内のパーティクルをまとめて描画する
+
+        Args:
+            ahead: 最後の update() からの経過時間（update() の dt と同じ単位）。その分だけ進めた位置に描く
+        """
+        n = self.count
+        if n == 0:
+            return
+        size = self.size[:n]
+        x, y = self._positions(ahead)
+        sx = x.astype(np.int32) - camera_x - size
+        sy = y.astype(np.int32) - camera_y - size
+        width, height = surface.get_size()
+        visible = (sx < width) & (sy < height) & (sx + size * 2 > 0) & (sy + size * 2 > 0)
+        idx = np.flatnonzero(visible)
+        if idx.size == 0:
+            return
+
+        # 見た目が同じパーティクルは同じ事前描画の円を使う
+        sprites = self.sprites.circles(self.color[idx], size[idx], 255 * self.life[idx] / self.max_life[idx])
+        surface.blits(zip(sprites, zip(sx[idx].tolist(), sy[idx].tolist())), doreturn=False)
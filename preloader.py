@@ -0,0 +1,97 @@
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from map_engine.floor_layout import FloorLayout
+from map_engine.map_generator import MapGenerator
+from map_engine.seeding import derive_seed, floor_seed
+from Trap import Trap
+from Trapmanager import TrapManager
+from enemy import Enemy
+
+
+class PreparedFloor:
+    """組み立て済みのフロア（画面に出す前のマップ・トラップ・敵の配置）"""
+
+    def __init__(self, run_seed: int, floor_number: int, layout: FloorLayout,
+                 traps: List[Trap], enemy_positions: List[Tuple[int, int]]):
+        self.run_seed = run_seed
+        self.floor_number = floor_number
+        self.layout = layout
+        self.traps = traps
+        self.enemy_positions = enemy_positions
+
+
+def build_floor(map_gen: MapGenerator, trap_manager: TrapManager, run_seed: int, floor_number: int,
+                trap_count: int, enemies_per_room: int) -> PreparedFloor:
+    """
+    ランのシードと階層番号からフロアを組み立てる
+
+    map_gen / trap_manager の現在の状態は変更しないので、別スレッドで実行してよい。
+    同じ run_seed / floor_number なら必ず同じフロアになる。
+    """
+    seed = floor_seed(run_seed, floor_number)
+    layout = map_gen.build_layout(derive_seed(seed, "map"))
+    traps = trap_manager.plan_traps(layout, trap_count, rng=random.Random(derive_seed(seed, "traps")))
+    enemy_positions = Enemy.spawn_positions(layout, enemies_per_room, rng=random.Random(derive_seed(seed, "enemies")))
+    return PreparedFloor(run_seed, floor_number, layout, traps, enemy_positions)
+
+
+class FloorPreloader:
+    """
+    次のフロアをワーカースレッドで先に組み立てておくクラス
+
+    階段に乗ったときは take() で組み立て済みのフロアを受け取るだけにして、
+    フレームの途中で重い生成処理が走らないようにする。
+    """
+
+    def __init__(self, map_gen: MapGenerator, trap_manager: TrapManager, trap_count: int, enemies_per_room: int):
+        self.map_gen = map_gen
+        self.trap_manager = trap_manager
+        self.trap_count = trap_count
+        self.enemies_per_room = enemies_per_room
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="floor-preload")
+        self._key: Optional[Tuple[int, int]] = None
+        self._future: Optional[Future] = None
+
+    def prepare(self, run_seed: int, floor_number: int):
+        """指定フロアの組み立てをワーカーに依頼する（既に依頼済みなら何もしない）"""
+        key = (run_seed, floor_number)
+        if self._key == key:
+            return
+        if self._future is not None:
+            self._future.cancel()
+        self._key = key
+        self._future = self._executor.submit(
+            build_floor, self.map_gen, self.trap_manager, run_seed, floor_number,
+            self.trap_count, self.enemies_per_room
+        )
+
+    def is_ready(self, run_seed: int, floor_number: int) -> bool:
+        """指定フロアの先読みが終わっているか"""
+        return self._key == (run_seed, floor_number) and self._future is not None and self._future.done()
+
+    def take(self, run_seed: int, floor_number: int) -> PreparedFloor:
+        """
+        組み立て済みのフロアを受け取る
+
+        先読みが終わっていればそのまま返す（一瞬で終わる）。
+        ワーカーが組み立て中なら完了を待ち、依頼していなかった・失敗した場合はこの場で組み立てる。
+        """
+        future = self._future if self._key == (run_seed, floor_number) else None
+        self._key = None
+        self._future = None
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"フロアの先読みに失敗しました: {e}")
+        return build_floor(self.map_gen, self.trap_manager, run_seed, floor_number,
+                           self.trap_count, self.enemies_per_room)
+
+    def shutdown(self):
+        """ワーカーを停止する"""
+        if self._future is not None:
+            self._future.cancel()
+        self._executor.shutdown(wait=False)
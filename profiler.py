@@ -0,0 +1,217 @@
+import csv
+import json
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pygame
+
+# フレーム全体（begin_frame から end_frame まで）の計測値の名前
+FRAME = "frame"
+# フレームのうち、どのフェーズにも入らなかった時間の名前
+OTHER = "other"
+
+
+class FrameProfiler:
+    """
+    フレームの処理時間をフェーズ（イベント処理・敵のターン・描画など）ごとに計測するクラス
+
+        profiler.begin_frame()
+        with profiler.phase("events"):
+            ...
+        profiler.end_frame()
+
+    - フェーズは入れ子にでき、親フェーズの時間からは子フェーズの時間を除く（フェーズの合計がフレームの時間になる）
+    - 同じフレームで同じフェーズを何度計測しても合計する（シミュレーションのステップごと・描画の矩形ごとなど）
+    - 直近 history フレームの値をフェーズごとのリングバッファに持ち、p50 / p95 / 最大を出せる
+    - toggle() で画面右上に一覧を重ねて表示する。export_csv() / export_json() で書き出せる
+    - note() で渡した1行の文字列（AI の LOD の集計など）も一覧の下に表示する
+    """
+
+    def __init__(self, history: int = 300, enabled: bool = True, refresh_frames: int = 15):
+        """
+        Args:
+            history: フェーズごとに保持するフレーム数
+            enabled: False なら計測しない（phase() は何もしない）
+            refresh_frames: 表示中の一覧を何フレームごとに計算し直すか
+        """
+        self.history = max(1, history)
+        self.enabled = enabled
+        self.refresh_frames = max(1, refresh_frames)
+        self.visible = False
+
+        self._phases: List[str] = []
+        self._samples: Dict[str, np.ndarray] = {}  # フェーズ -> 直近のフレームの時間 (ms) のリングバッファ
+        self._frames = 0  # 記録したフレーム数
+        self._current: Dict[str, float] = {}  # 計測中のフレームのフェーズごとの時間 (秒)
+        self._stack: List[list] = []  # [フェーズ, 開始時刻, 子フェーズの時間]
+        self._frame_start: Optional[float] = None
+        self._notes: Dict[str, str] = {}  # 名前 -> 一覧の下に表示する1行
+
+        self._font: Optional[pygame.font.Font] = None
+        self._overlay: Optional[pygame.Surface] = None
+        self.version = 0  # 表示が変わるたびに増える（DirtyRectRenderer の state 用）
+
+    # --- 計測 ---
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._stack.clear()
+        self._frame_start = time.perf_counter()
+
+    def phase(self, name: str) -> "FrameProfiler":
+        """with 文で name のフェーズを計測する"""
+        if self.enabled:
+            self._stack.append([name, 0.0, 0.0])
+        return self
+
+    def __enter__(self):
+        if self.enabled and self._stack:
+            self._stack[-1][1] = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled or not self._stack:
+            return False
+        name, start, children = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self._current[name] = self._current.get(name, 0.0) + elapsed - children
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        return False
+
+    def end_frame(self):
+        """フレームの計測値をリングバッファに記録する"""
+        if not self.enabled or self._frame_start is None:
+            return
+        frame = time.perf_counter() - self._frame_start
+        self._current[OTHER] = max(0.0, frame - sum(self._current.values()))
+        self._current[FRAME] = frame
+        self._frame_start = None
+
+        slot = self._frames % self.history
+        for name in self._current:
+            if name not in self._samples:
+                self._phases.append(name)
+                self._samples[name] = np.zeros(self.history, dtype=np.float32)
+        for name in self._phases:
+            self._samples[name][slot] = self._current.get(name, 0.0) * 1000.0
+        self._frames += 1
+
+        if self.visible and self._frames % self.refresh_frames == 0:
+            self._overlay = None
+
+    def note(self, name: str, text: str):
+        """一覧の下に表示する1行を設定する（表示は一覧の計算し直しと同じ間隔で更新される）"""
+        self._notes[name] = text
+
+    # --- 集計・書き出し ---
+
+    def samples(self, name: str) -> np.ndarray:
+        """name の直近の計測値 (ms)。古い順"""
+        buf = self._samples.get(name)
+        if buf is None:
+            return np.zeros(0, dtype=np.float32)
+        if self._frames <= self.history:
+            return buf[:self._frames].copy()
+        slot = self._frames % self.history
+        return np.concatenate([buf[slot:], buf[:slot]])
+
+    def phases(self) -> List[str]:
+        """計測したフェーズ（フレーム全体が先頭、その他が末尾）"""
+        if not self._phases:
+            return []
+        return [FRAME] + [name for name in self._phases if name not in (FRAME, OTHER)] + [OTHER]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """フェーズごとの直近 history フレームの p50 / p95 / 最大 (ms)"""
+        result = {}
+        for name in self.phases():
+            values = self.samples(name)
+            if values.size == 0:
+                continue
+            p50, p95 = np.percentile(values, [50, 95])
+            result[name] = {"p50": float(p50), "p95": float(p95), "max": float(values.max())}
+        return result
+
+    def export_csv(self, path: str):
+        """直近の計測値を1フレーム1行の CSV に書き出す (ms)"""
+        phases = self.phases()
+        columns = [self.samples(name) for name in phases]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_ms" for name in phases])
+            first = self._frames - len(columns[0]) if columns else 0
+            for i, row in enumerate(zip(*columns)):
+                writer.writerow([first + i] + [f"{v:.4f}" for v in row])
+
+    def export_json(self, path: str):
+        """直近の計測値と集計を JSON に書き出す (ms)"""
+        data = {
+            "frames": self._frames,
+            "history": self.history,
+            "summary": self.summary(),
+            "samples_ms": {name: [round(float(v), 4) for v in self.samples(name)] for name in self.phases()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def export(self, basename: Optional[str] = None) -> str:
+        """CSV と JSON を両方書き出し、拡張子なしのファイル名を返す"""
+        basename = basename or time.strftime("profile_%Y%m%d_%H%M%S")
+        self.export_csv(basename + ".csv")
+        self.export_json(basename + ".json")
+        return basename
+
+    # --- 表示 ---
+
+    def toggle(self):
+        """一覧の表示を切り替える"""
+        self.visible = not self.visible
+        self._overlay = None
+        self.version += 1
+
+    def _render_overlay(self) -> pygame.Surface:
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        font = self._font
+        color = (220, 255, 220)
+        rows = [["phase", "p50", "p95", "max"]]
+        for name, s in self.summary().items():
+            rows.append([name, f"{s['p50']:.2f}", f"{s['p95']:.2f}", f"{s['max']:.2f}"])
+        # 表の下の行（列に揃えない）
+        footer = [f"ms / {min(self._frames, self.history)} frames"] + list(self._notes.values())
+
+        # フェーズ名は左揃え、数値は右揃えで列を揃える
+        name_width = max(font.size(row[0])[0] for row in rows)
+        column_width = 52
+        line_height = font.get_linesize()
+        width = max([12 + name_width + column_width * 3] + [font.size(line)[0] + 12 for line in footer])
+        rows += [[line, "", "", ""] for line in footer]
+        overlay = pygame.Surface((width, line_height * len(rows) + 8), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, row in enumerate(rows):
+            y = 4 + i * line_height
+            overlay.blit(font.render(row[0], True, color), (6, y))
+            for j, cell in enumerate(row[1:], start=1):
+                if cell:
+                    text = font.render(cell, True, color)
+                    overlay.blit(text, (6 + name_width + column_width * j - text.get_width(), y))
+        return overlay
+
+    def get_rect(self, surface: pygame.Surface) -> Optional[pygame.Rect]:
+        """一覧を表示する画面上の矩形（表示していなければ None）"""
+        if not self.visible:
+            return None
+        if self._overlay is None:
+            self._overlay = self._render_overlay()
+            self.version += 1
+        return self._overlay.get_rect(topright=(surface.get_width() - 10, 10))
+
+    def draw(self, surface: pygame.Surface):
+        """一覧を画面右上に描画（表示していなければ何もしない）"""
+        rect = self.get_rect(surface)
+        if rect is not None:
+            surface.blit(self._overlay, rect)
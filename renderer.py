@@ -0,0 +1,127 @@
+import pygame
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class DirtyRectRenderer:
+    """
+    変化した領域だけを画面に送るレンダラー
+
+    ターン制で静止しているフレームが多いため、
+    - カメラが動いたフレーム / 明示的に要求されたフレームは全画面を再描画して flip
+    - それ以外は変化した矩形だけを再描画して pygame.display.update(rects)
+    - 何も変化していなければ描画自体を省略
+    する。
+    """
+
+    def __init__(self, screen_size: Tuple[int, int], enabled: bool = True, full_redraw_ratio: float = 0.5):
+        """
+        Args:
+            screen_size: 画面サイズ (幅, 高さ)
+            enabled: False の場合は毎フレーム全画面を描画して flip する（従来の動作）
+            full_redraw_ratio: 変化領域の面積が画面のこの割合を超えたら全画面再描画に切り替える
+        """
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.enabled = enabled
+        self.full_redraw_ratio = full_redraw_ratio
+
+        self._camera: Optional[Tuple[int, int]] = None
+        self._full_redraw = True
+        self._dirty: List[pygame.Rect] = []
+        # key -> (画面上の矩形, 状態) : 前フレームと今フレームの追跡対象
+        self._prev: Dict[Hashable, Tuple[pygame.Rect, Hashable]] = {}
+        self._curr: Dict[Hashable, Tuple[pygame.Rect, Hashable]] = {}
+
+        # 直近フレームで画面に送った矩形（デバッグ・計測用）
+        self.last_update_rects: List[pygame.Rect] = []
+
+    def begin_frame(self, camera_x: int, camera_y: int):
+        """フレーム開始。カメラが動いていれば全画面再描画にする"""
+        camera = (camera_x, camera_y)
+        if camera != self._camera:
+            self._full_redraw = True
+            self._camera = camera
+
+    def request_full_redraw(self):
+        """次の present() で全画面を再描画する（マップ再生成や表示切り替え時）"""
+        self._full_redraw = True
+
+    def mark_dirty(self, rect):
+        """画面座標の矩形を変化領域として登録する"""
+        self._dirty.append(pygame.Rect(rect))
+
+    def track(self, key: Hashable, rect, state: Hashable = None):
+        """
+        描画物を追跡する。前フレームと矩形か状態が変わっていれば新旧両方の矩形を変化領域にする。
+        前フレームで追跡していて今フレームで track されなかったものは、消えた領域として再描画される。
+
+        Args:
+            key: 描画物を識別するキー
+            rect: 画面座標の矩形
+            state: 見た目を左右する値（向き・表示テキストなど）。変化すれば再描画する
+        """
+        self._curr[key] = (pygame.Rect(rect), state)
+
+    def present(self, screen: pygame.Surface, draw_scene: Callable[[pygame.Surface], None]):
+        """
+        変化領域を再描画して画面に反映する
+
+        Args:
+            screen: 描画先（ディスプレイ）サーフェス
+            draw_scene: シーン全体を描画する関数。クリップ領域を設定した状態で呼ばれる
+        """
+        dirty = self._collect_dirty()
+
+        if not self.enabled or self._full_redraw or self._too_large(dirty):
+            screen.set_clip(None)
+            draw_scene(screen)
+            pygame.display.flip()
+            self.last_update_rects = [self.screen_rect.copy()]
+        elif dirty:
+            for rect in dirty:
+                screen.set_clip(rect)
+                draw_scene(screen)
+            screen.set_clip(None)
+            pygame.display.update(dirty)
+            self.last_update_rects = dirty
+        else:
+            self.last_update_rects = []
+
+        self._full_redraw = False
+        self._dirty = []
+        self._prev = self._curr
+        self._curr = {}
+
+    def _collect_dirty(self) -> List[pygame.Rect]:
+        """追跡結果と mark_dirty() の矩形をまとめ、重なる矩形を結合して返す"""
+        rects = list(self._dirty)
+        for key, (rect, state) in self._curr.items():
+            prev = self._prev.get(key)
+            if prev is None:
+                rects.append(rect)
+            elif prev != (rect, state):
+                rects.append(prev[0])
+                rects.append(rect)
+        for key, (rect, _) in self._prev.items():
+            if key not in self._curr:
+                rects.append(rect)
+
+        # 画面内にクリップし、重なる矩形を結合する
+        merged: List[pygame.Rect] = []
+        for rect in rects:
+            rect = rect.clip(self.screen_rect)
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            i = 0
+            while i < len(merged):
+                if merged[i].colliderect(rect):
+                    rect = rect.union(merged.pop(i))
+                    i = 0
+                else:
+                    i += 1
+            merged.append(rect)
+        return merged
+
+    def _too_large(self, dirty: List[pygame.Rect]) -> bool:
+        """変化領域が大きすぎて全画面再描画の方が安いか"""
+        area = sum(r.width * r.height for r in dirty)
+        return area > self.screen_rect.width * self.screen_rect.height * self.full_redraw_ratio
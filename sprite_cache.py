@@ -0,0 +1,98 @@
+from typing import List, Tuple
+
+import numpy as np
+import pygame
+
+from map_engine.lru_cache import LRUCache
+
+
+class SpriteCache(LRUCache):
+    """
+    事前描画した半透明スプライト (円・リング・塗りつぶし矩形) の LRU キャッシュ
+
+    毎フレーム SRCALPHA の Surface を作って描く代わりに、
+    (形, 色, 大きさ, 段階化したアルファ) ごとに1度だけ描いて使い回す。
+    アルファは alpha_levels 段階にまとめるので、フェードアウトしても作るスプライトは段階数だけで済む。
+    hits / misses を見て alpha_levels と max_entries を調整する。
+    """
+
+    def __init__(self, max_entries: int = 1024, alpha_levels: int = 16):
+        super().__init__(max_entries)
+        self.alpha_levels = max(2, alpha_levels)
+
+    def quantize_alpha(self, alpha: float) -> int:
+        """アルファ値 (0〜255) を alpha_levels 段階のいずれかの値にまとめる"""
+        steps = self.alpha_levels - 1
+        level = int(round(max(0.0, min(255.0, alpha)) * steps / 255))
+        return level * 255 // steps
+
+    def quantize_alpha_array(self, alpha: np.ndarray) -> np.ndarray:
+        """quantize_alpha() の配列版"""
+        steps = self.alpha_levels - 1
+        level = np.rint(np.clip(alpha, 0, 255) * steps / 255).astype(np.int64)
+        return level * 255 // steps
+
+    def circle(self, color: Tuple[int, int, int], radius: int, alpha: float = 255, width: int = 0) -> pygame.Surface:
+        """
+        半径 radius の円 (width > 0 ならリング) を描いた (2 * radius) 四方のスプライト
+
+        描画位置は (中心x - radius, 中心y - radius)。
+        """
+        radius = max(0, int(radius))
+        rgba = (int(color[0]), int(color[1]), int(color[2]), self.quantize_alpha(alpha))
+        return self.get(("circle", rgba, radius, width), lambda: _render_circle(rgba, radius, width))
+
+    def circles(self, color: np.ndarray, radius: np.ndarray, alpha: np.ndarray) -> List[pygame.Surface]:
+        """
+        circle() の配列版（パーティクルの描画用）。color は (N, 3)、radius と alpha は長さ N
+
+        (色, 半径, 段階化したアルファ) を1つの整数のキーにまとめ、同じキーはこの呼び出しの中でキャッシュを1度だけ引く。
+        半径は 256 未満であること。
+        """
+        color = np.asarray(color).astype(np.int64)
+        rgb = (color[:, 0] << 16) | (color[:, 1] << 8) | color[:, 2]
+        keys = (rgb << 16) | (np.asarray(radius).astype(np.int64) << 8) | self.quantize_alpha_array(alpha)
+
+        sprites = {}
+        result = []
+        for key in keys.tolist():
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = sprites[key] = self.circle(
+                    ((key >> 32) & 0xFF, (key >> 24) & 0xFF, (key >> 16) & 0xFF), (key >> 8) & 0xFF, key & 0xFF
+                )
+            result.append(sprite)
+        return result
+
+    def rect(self, color: Tuple[int, int, int], size: Tuple[int, int], alpha: float = 255) -> pygame.Surface:
+        """size の大きさで塗りつぶした矩形のスプライト"""
+        size = (int(size[0]), int(size[1]))
+        rgba = (int(color[0]), int(color[1]), int(color[2]), self.quantize_alpha(alpha))
+        return self.get(("rect", rgba, size), lambda: _render_rect(rgba, size))
+
+    def stats(self) -> str:
+        """キャッシュの統計（調整・デバッグ用）"""
+        return (f"sprites: {len(self)}/{self.max_entries} "
+                f"hit {self.hits} miss {self.misses} evict {self.evictions} ({self.hit_rate():.1%})")
+
+
+def _render_circle(rgba, radius: int, width: int) -> pygame.Surface:
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    if radius > 0:
+        pygame.draw.circle(sprite, rgba, (radius, radius), radius, width)
+    return sprite
+
+
+def _render_rect(rgba, size: Tuple[int, int]) -> pygame.Surface:
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    sprite.fill(rgba)
+    return sprite
+
+
+# ゲーム全体で共有するキャッシュ
+_shared = SpriteCache()
+
+
+def shared_cache() -> SpriteCache:
+    """ゲーム全体で共有するスプライトキャッシュ"""
+    return _shared
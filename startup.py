@@ -0,0 +1,58 @@
+import time
+from typing import Any, Generator, Optional, Tuple
+
+# 準備の各段階が返す (進捗 0.0〜1.0, 表示する説明)
+Stage = Tuple[float, str]
+
+
+class StartupPipeline:
+    """
+    タイトル画面の裏でゲーム開始の準備（アセットの読み込み・最初のフロアの組み立て）を少しずつ進めるクラス
+
+    準備の処理は (進捗, 説明) を yield するジェネレータとして書き、重い処理の合間ごとに yield する。
+    タイトル画面が毎フレーム step() を呼ぶと、予算の時間だけジェネレータを進めて返ってくるので、
+    準備の間もタイトル画面のアニメーションは止まらない。
+    ワーカースレッドの完了を待つ段階は、終わるまで同じ (進捗, 説明) を yield し続ければよい
+    （同じ段階が続けて yield されたら待ち中とみなし、そのフレームの分はそこで切り上げる）。
+    ジェネレータの戻り値は result に入る。
+    """
+
+    def __init__(self, stages: Generator[Stage, None, Any]):
+        self._stages = stages
+        self.progress = 0.0
+        self.label = ""
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def step(self, budget_ms: float = 4.0) -> bool:
+        """
+        準備を budget_ms ミリ秒ぶん進める（1段階は必ず進める）
+
+        Returns:
+            準備が終わったか（失敗した場合も True。error を確認すること）
+        """
+        if self.done:
+            return True
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        try:
+            while True:
+                stage = (self.progress, self.label)
+                self.progress, self.label = next(self._stages)
+                if (self.progress, self.label) == stage or time.perf_counter() >= deadline:
+                    return False
+        except StopIteration as stop:
+            self.result = stop.value
+            self.progress = 1.0
+        except Exception as e:
+            self.error = e
+        self.done = True
+        return True
+
+    def finish(self):
+        """残りの準備を最後まで進めて結果を返す（失敗していれば例外を投げ直す）"""
+        while not self.step(budget_ms=float("inf")):
+            time.sleep(0.001)  # ワーカーの完了待ち
+        if self.error is not None:
+            raise self.error
+        return self.result
@@ -0,0 +1,32 @@
+from map_engine.chunked_world import ChunkedWorld
+
+
+def test_edge_regions_keep_doors_on_both_sides():
+    # 5000 = 78 * 64 + 8 なので、右端・下端の区画は幅・高さ 8 しかない
+    world = ChunkedWorld(5000, 5000, region_size=64)
+    rs = world.region_size
+    last = world.width // rs
+    for seed in range(20):
+        world.generate(seed)
+        for rx, ry in ((last, last), (last, 10), (10, last)):
+            x0, y0, w, h = world._region_bounds(rx, ry)
+            # 左隣との境界
+            d = world._door("v", rx, ry, h)
+            assert world.is_floor(x0 - 1, y0 + d) and world.is_floor(x0, y0 + d)
+            # 上隣との境界
+            d = world._door("h", rx, ry, w)
+            assert world.is_floor(x0 + d, y0 - 1) and world.is_floor(x0 + d, y0)
+
+
+def test_world_floor_keeps_start_tile_free():
+    from Trapmanager import TrapManager
+    from main import DEFAULT_TILE_SIZE, generate_world_floor
+
+    trap_manager = TrapManager(DEFAULT_TILE_SIZE)
+    for size in (5000, 700):
+        world = ChunkedWorld(size, size, tile_size=DEFAULT_TILE_SIZE)
+        for seed in range(30):
+            enemies, stairs = generate_world_floor(world, trap_manager, seed, 1)
+            start = world.start_pos()
+            assert trap_manager.trap_at(*start) is None
+            assert start not in [enemies.tile_pos(i) for i in enemies.alive_indices()]
@@ -0,0 +1,19 @@
+from map_engine.lru_cache import LRUCache
+
+
+def test_get_builds_once_and_evicts_least_recently_used():
+    cache = LRUCache(2)
+    built = []
+
+    def builder(value):
+        return lambda: built.append(value) or value
+
+    assert cache.get("a", builder(1)) == 1
+    assert cache.get("b", builder(None)) is None
+    assert cache.get("a", builder(2)) == 1
+    assert cache.get("b", builder(3)) is None  # None もキャッシュする
+    assert cache.get("c", builder(4)) == 4  # 最も長く使われていない "a" を捨てる
+    assert cache.lookup("a") is None
+    assert built == [1, None, 4]
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 4, 1)
+    assert len(cache) == 2
@@ -0,0 +1,22 @@
+from particles import ParticleSystem
+
+
+def emit(system, count, life):
+    system.emit(0, 0, count, [(255, 255, 255)], (0, 0), (0, 0), 0.0, life_range=(life, life))
+
+
+def test_shortest_overflow_drops_the_shortest_lived_particles():
+    system = ParticleSystem(max_particles=4, overflow="shortest", seed=0)
+    emit(system, 2, 10)
+    emit(system, 2, 50)
+    emit(system, 2, 30)
+    assert len(system) == 4
+    assert sorted(system.life[:len(system)].tolist()) == [30, 30, 50, 50]
+    assert system.dropped == 2
+
+
+def test_emit_grows_arrays_without_a_limit():
+    system = ParticleSystem(capacity=2, seed=0)
+    emit(system, 5, 20)
+    assert len(system) == 5
+    assert len(system.x) == 8 and system.color.shape == (8, 3)
@@ -0,0 +1,99 @@
+import numpy as np
+
+from map_engine.pathfinding import PathPlanner, astar
+
+
+class GridMap:
+    """tilemap[x, y] (1=床) だけを持つ、PathPlanner 用の最小のマップ"""
+
+    def __init__(self, tilemap):
+        self.tilemap = tilemap
+        self.width, self.height = tilemap.shape
+
+    def is_floor(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.tilemap[x, y])
+
+
+def two_corridors(length=120):
+    """y=1 と y=3 の2本の通路を両端 (x=1, x=length-2) でつないだマップ"""
+    tilemap = np.zeros((length, 5), dtype=np.uint8)
+    tilemap[1:length - 1, 1] = 1
+    tilemap[1:length - 1, 3] = 1
+    tilemap[1, 1:4] = 1
+    tilemap[length - 2, 1:4] = 1
+    return GridMap(tilemap)
+
+
+def walk(planner, pos, goal, blocked, turns):
+    """planner に従って pos から goal まで歩かせ、たどり着いたターン数を返す (着かなければ None)"""
+    for turn in range(turns):
+        planner.begin_turn()
+        if pos == goal:
+            return turn
+        step = planner.next_step("agent", pos, goal, blocked)
+        if step is not None:
+            assert step not in blocked
+            pos = step
+    return None
+
+
+def test_blocked_path_falls_back_to_full_search():
+    map_gen = two_corridors()
+    start, goal = (3, 1), (116, 1)
+    planner = PathPlanner(map_gen)
+    # ふさがれる前に上の通路を通る経路をキャッシュさせる
+    planner.begin_turn()
+    assert planner.next_step("agent", start, goal) == (4, 1)
+
+    # 上の通路を完全にふさぐ。近くに合流できる迂回路はなく、下の通路を回るしかない
+    blocked = {(6, 1), (7, 1)}
+    assert astar(map_gen.is_floor, start, goal, blocked)[0] is not None
+    turns = walk(planner, start, goal, blocked, turns=400)
+    assert turns is not None
+    assert planner.full_searches == 2
+
+
+def test_unreachable_goal_is_not_searched_every_turn():
+    map_gen = two_corridors()
+    start, goal = (5, 1), (116, 1)
+    planner = PathPlanner(map_gen, unreachable_retry=8)
+    planner.begin_turn()
+    planner.next_step("agent", start, goal)
+
+    # 両方の通路をふさぐ（経路の次のタイルもふさがれる）
+    blocked = {(6, 1), (6, 3)}
+    expansions = []
+    for _ in range(8):
+        planner.begin_turn()
+        assert planner.next_step("agent", start, goal, blocked) is None
+        expansions.append(planner.budget_per_turn - planner.budget)
+    # 到達できないと分かった後は、再試行の間隔が来るまで探索しない
+    assert expansions[0] > 0
+    assert expansions[1:7] == [0] * 6
+    assert planner.deferred == 0
+
+
+def test_enemy_pool_step_to_moves_slot_and_occupancy():
+    from enemy_pool import EnemyPool
+    from occupancy import OccupancyGrid
+
+    map_gen = two_corridors(length=20)
+    pool = EnemyPool.from_positions([(3, 1), (1, 2)], tile_size=32)
+    occupancy = OccupancyGrid()
+    pool.register(occupancy)
+    planner = PathPlanner(map_gen)
+
+    goal = (10, 1)
+    for _ in range(7):
+        planner.begin_turn()
+        assert pool.step_to(0, goal, planner, occupancy)
+    assert pool.tile_pos(0) == goal
+    assert occupancy.at(goal) == 0
+    assert occupancy.at((3, 1)) is None
+
+    # 他の敵のいるタイルには入らない
+    for _ in range(20):
+        planner.begin_turn()
+        pool.step_to(1, goal, planner, occupancy)
+    assert pool.tile_pos(1) == (9, 1)
+    assert occupancy.at((9, 1)) == 1
@@ -0,0 +1,45 @@
+from typing import Tuple
+
+import pygame
+
+from map_engine.lru_cache import LRUCache
+
+WHITE = (255, 255, 255)
+
+
+class TextCache(LRUCache):
+    """
+    1つのフォントで描いた文字列・文字 (グリフ) の LRU キャッシュ
+
+    - render() : 文字列を (文字列, 色) ごとに1度だけ描いて使い回す（色の変わらないテキスト向け）
+    - tinted() : 文字を白で1度だけ描いておき、毎フレーム変わる色は乗算で付ける
+                 色は color_step 段階にまとめて (文字, 色) ごとにキャッシュするので、
+                 色が周期的に変わるだけなら font.render も乗算もいずれ呼ばれなくなる
+    """
+
+    def __init__(self, font: pygame.font.Font, max_entries: int = 2048, color_step: int = 16):
+        super().__init__(max_entries)
+        self.font = font
+        self.color_step = max(1, color_step)
+
+    def render(self, text: str, color: Tuple[int, int, int] = WHITE) -> pygame.Surface:
+        """text を color で描いた Surface（アンチエイリアスあり）"""
+        return self.get((text, tuple(color)), lambda: self.font.render(text, True, color))
+
+    def glyph(self, char: str) -> pygame.Surface:
+        """白で描いた1文字"""
+        return self.render(char, WHITE)
+
+    def tinted(self, char: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """白のグリフに color（color_step 段階にまとめた色）を乗算した1文字"""
+        step = self.color_step
+        color = tuple(min(255, c // step * step + step // 2) for c in color)
+        return self.get(("tint", char, color), lambda: self._render_tinted(char, color))
+
+    def _render_tinted(self, char: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        glyph = self.glyph(char)
+        surface = pygame.Surface(glyph.get_size(), pygame.SRCALPHA)
+        # (色, 255) で塗ってから白のグリフを乗算 -> RGB は color、アルファはグリフの形
+        surface.fill(color + (255,))
+        surface.blit(glyph, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        return surface